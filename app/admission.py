@@ -0,0 +1,234 @@
+import os
+import json
+import math
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from fastapi import UploadFile, HTTPException
+
+
+# ------------------------------------------------------------------------------
+#                               LIMITS (per worker)
+# ------------------------------------------------------------------------------
+UPLOAD_MAX_CONCURRENCY = int(os.getenv("UPLOAD_MAX_CONCURRENCY", "2"))
+UPLOAD_MAX_QUEUED_BYTES = int(os.getenv("UPLOAD_MAX_QUEUED_BYTES", str(200 * 1024 * 1024)))
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_QUEUE_TIMEOUT = float(os.getenv("UPLOAD_QUEUE_TIMEOUT", "30"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "100"))
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class AdmissionController:
+    """Bounds how many statement uploads a worker parses at once.
+
+    Each request reserves its size in bytes before it is parsed. Requests that
+    would push the reserved total over `max_queued_bytes`, or that wait longer
+    than `queue_timeout` for a parsing slot, are turned away with a 429 and a
+    Retry-After estimated from recent processing times.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queued_bytes: int,
+        queue_timeout: float,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queued_bytes = max_queued_bytes
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.queued_bytes = 0
+        self.admitted = 0
+        self.rejected_bytes = 0
+        self.rejected_timeout = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_service = 0.0
+
+    def retry_after(self) -> int:
+        avg_service = self.total_service / self.admitted if self.admitted else 1.0
+        backlog = (self.waiting + self.in_flight) / max(self.max_concurrency, 1)
+        return max(1, math.ceil(avg_service * max(backlog, 1)))
+
+    def _reject(self, detail: str):
+        raise HTTPException(
+            status_code=429,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after())},
+        )
+
+    @asynccontextmanager
+    async def admit(self, nbytes: int):
+        if self.queued_bytes + nbytes > self.max_queued_bytes:
+            self.rejected_bytes += 1
+            self._reject("Server busy: upload queue is full")
+
+        self.queued_bytes += nbytes
+        self.waiting += 1
+        start = time.monotonic()
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                self._reject("Server busy: timed out waiting for a processing slot")
+            finally:
+                self.waiting -= 1
+
+            wait = time.monotonic() - start
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.admitted += 1
+            self.in_flight += 1
+            started = time.monotonic()
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+                self.total_service += time.monotonic() - started
+                self._slots.release()
+        finally:
+            self.queued_bytes -= nbytes
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queued_bytes": self.max_queued_bytes,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "queued_bytes": self.queued_bytes,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_bytes,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_wait_ms": round(1000 * self.total_wait / self.admitted, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 2),
+            "avg_service_ms": round(1000 * self.total_service / self.admitted, 2) if self.admitted else 0.0,
+        }
+
+
+upload_admission = AdmissionController(
+    max_concurrency=UPLOAD_MAX_CONCURRENCY,
+    max_queued_bytes=UPLOAD_MAX_QUEUED_BYTES,
+    queue_timeout=UPLOAD_QUEUE_TIMEOUT,
+)
+
+
+# ------------------------------------------------------------------------------
+#                               BODY SIZE LIMIT
+# ------------------------------------------------------------------------------
+# Room for the multipart boundaries, part headers and small form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+UPLOAD_BODY_LIMITS = {
+    "/api/upload-statement": UPLOAD_MAX_FILE_BYTES + MULTIPART_OVERHEAD,
+    "/api/upload-statements": UPLOAD_MAX_QUEUED_BYTES + MULTIPART_OVERHEAD,
+}
+
+
+class UploadSizeLimitMiddleware:
+    """ASGI middleware that enforces the upload size limits while the body streams in.
+
+    FastAPI reads and spools the whole multipart body to resolve `File(...)`
+    before the endpoint runs, so a check inside the endpoint comes too late.
+    Here an oversized Content-Length is answered with a 413 before any of the
+    body is read, and bodies without one (or lying about it) are cut off with a
+    413 as soon as the running byte count passes the limit.
+    """
+
+    def __init__(self, app, limits: Dict[str, int] = UPLOAD_BODY_LIMITS):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        try:
+            declared = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            declared = 0
+        if declared > limit:
+            await _send_413(send, limit)
+            return
+
+        received = 0
+        started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(413, f"Upload exceeds {limit} bytes")
+            return message
+
+        async def tracking_send(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as e:
+            if e.status_code != 413 or started:
+                raise
+            await _send_413(send, limit)
+
+
+async def _send_413(send, limit: int):
+    body = json.dumps({"detail": f"Upload exceeds {limit} bytes"}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# ------------------------------------------------------------------------------
+#                               BOUNDED READ
+# ------------------------------------------------------------------------------
+def check_declared_size(content_length: Optional[str], max_bytes: int = UPLOAD_MAX_FILE_BYTES) -> int:
+    """Size to reserve for a request, taken from its Content-Length header.
+
+    By the time an endpoint runs FastAPI has already received the body, so
+    this is not what keeps large uploads out; UploadSizeLimitMiddleware does
+    that while the body streams in.
+    """
+    try:
+        declared = int(content_length) if content_length else 0
+    except ValueError:
+        declared = 0
+    if declared > max_bytes:
+        raise HTTPException(413, f"Upload exceeds {max_bytes} bytes")
+    return declared
+
+
+async def read_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_FILE_BYTES) -> bytes:
+    """Read one spooled upload into memory in chunks, stopping once it passes `max_bytes`."""
+    chunks = []
+    size = 0
+    while True:
+        chunk = await file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(413, f"Upload exceeds {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
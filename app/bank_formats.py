@@ -0,0 +1,184 @@
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, date
+from typing import Dict, List, Optional, Pattern, Tuple
+
+
+# A parsed statement row: (date, description, debit, credit, balance)
+Row = Tuple[Optional[date], str, Optional[float], Optional[float], Optional[float]]
+
+
+# ------------------------------------------------------------------------------
+#                               BANK FORMAT TEMPLATE
+# ------------------------------------------------------------------------------
+@dataclass
+class BankFormat:
+    """Parsing template for one bank's statement layout.
+
+    `line_pattern` is matched against every text line. Its named groups are the
+    column map: `date`, `description` and `balance` are required, amounts come
+    either from `debit` / `credit` groups or from a single `amount` group plus a
+    `drcr` marker ("Dr" / "Cr").
+    """
+    name: str
+    line_pattern: Pattern
+    date_formats: List[str]
+    fingerprints: List[str] = field(default_factory=list)
+    skip_pattern: Optional[Pattern] = None
+
+    def parse_date(self, val: str) -> Optional[date]:
+        for fmt in self.date_formats:
+            try:
+                return datetime.strptime(val, fmt).date()
+            except ValueError:
+                pass
+        return None
+
+    def parse_line(self, line: str) -> Optional[Row]:
+        m = self.line_pattern.match(line.strip())
+        if not m:
+            return None
+
+        groups = m.groupdict()
+        desc = groups["description"].strip()
+        if self.skip_pattern is not None and self.skip_pattern.search(desc):
+            return None
+
+        date_val = self.parse_date(groups["date"])
+        if date_val is None:
+            return None
+
+        if "amount" in groups:
+            amount = parse_amount(groups["amount"])
+            is_credit = (groups.get("drcr") or "").lower().startswith("cr")
+            debit, credit = (None, amount) if is_credit else (amount, None)
+        else:
+            debit = parse_amount(groups.get("debit"))
+            credit = parse_amount(groups.get("credit"))
+
+        return date_val, desc, debit, credit, parse_amount(groups["balance"])
+
+    def parse_lines(self, lines: List[str]) -> List[Row]:
+        rows = []
+        for line in lines:
+            row = self.parse_line(line)
+            if row is not None:
+                rows.append(row)
+        return rows
+
+
+def parse_amount(val: Optional[str]) -> Optional[float]:
+    if not val or val == "-":
+        return None
+    try:
+        return float(val.replace(",", ""))
+    except ValueError:
+        return None
+
+
+# ------------------------------------------------------------------------------
+#                               FORMAT REGISTRY
+# ------------------------------------------------------------------------------
+_AMOUNT = r"[\d,]+\.\d{2}"
+_SKIP_SUMMARY = re.compile(
+    r"\b(opening|closing)\s+balance\b|\bbalance\s+(b/?f|c/?f|brought|carried)\b",
+    re.IGNORECASE,
+)
+
+_DECLARED_AMOUNT = re.compile(r"[\d,]+\.\d{2}")
+
+
+def summary_kind(text: str) -> Optional[str]:
+    """"opening" or "closing" if `text` is a printed balance summary line."""
+    m = _SKIP_SUMMARY.search(text or "")
+    if m is None:
+        return None
+    word = (m.group(1) or m.group(2)).lower()
+    return "opening" if word in ("opening", "b/f", "bf", "brought") else "closing"
+
+
+def declared_balances(line: str) -> List[Tuple[str, float]]:
+    """Printed opening / closing balances on a line, as (kind, amount).
+
+    A line may carry both ("Opening Balance 1,000.00 Closing Balance 900.00");
+    each label takes the last amount before the next label.
+    """
+    found = []
+    matches = list(_SKIP_SUMMARY.finditer(line))
+    for m, nxt in zip(matches, matches[1:] + [None]):
+        amounts = _DECLARED_AMOUNT.findall(line, m.end(), nxt.start() if nxt else len(line))
+        if amounts:
+            found.append((summary_kind(m.group(0)), parse_amount(amounts[-1])))
+    return found
+
+
+def note_declared(declared: Dict[str, float], kind: str, amount: Optional[float]):
+    """Keep the first opening and the last closing balance a statement prints."""
+    if amount is None:
+        return
+    if kind == "opening":
+        declared.setdefault("opening", amount)
+    else:
+        declared["closing"] = amount
+
+
+DEFAULT_FORMAT = BankFormat(
+    name="default",
+    line_pattern=re.compile(
+        rf"^(?P<date>\d{{2}}/\d{{2}}/\d{{4}})\s+(?P<description>.+?)\s+"
+        rf"(?P<debit>{_AMOUNT}|-)\s+(?P<credit>{_AMOUNT}|-)\s+(?P<balance>{_AMOUNT})$"
+    ),
+    date_formats=["%d/%m/%Y"],
+    skip_pattern=_SKIP_SUMMARY,
+)
+
+BANK_FORMATS: List[BankFormat] = [
+    # SBI: txn date, value date, description, debit, credit, balance
+    BankFormat(
+        name="sbi",
+        line_pattern=re.compile(
+            rf"^(?P<date>\d{{1,2}} \w{{3}} \d{{4}})\s+\d{{1,2}} \w{{3}} \d{{4}}\s+"
+            rf"(?P<description>.+?)\s+(?P<debit>{_AMOUNT}|-)\s+"
+            rf"(?P<credit>{_AMOUNT}|-)\s+(?P<balance>{_AMOUNT})$"
+        ),
+        date_formats=["%d %b %Y"],
+        fingerprints=["state bank of india"],
+        skip_pattern=_SKIP_SUMMARY,
+    ),
+    # Single amount column with a Dr/Cr marker (ICICI, Axis and most co-op banks)
+    BankFormat(
+        name="drcr",
+        line_pattern=re.compile(
+            rf"^(?P<date>\d{{2}}[/-]\d{{2}}[/-]\d{{4}})\s+(?P<description>.+?)\s+"
+            rf"(?P<amount>{_AMOUNT})\s*(?P<drcr>Dr|Cr|DR|CR)\.?\s+"
+            rf"(?P<balance>{_AMOUNT})(\s*(Dr|Cr|DR|CR)\.?)?$"
+        ),
+        date_formats=["%d/%m/%Y", "%d-%m-%Y"],
+        fingerprints=["icici bank", "axis bank"],
+        skip_pattern=_SKIP_SUMMARY,
+    ),
+    DEFAULT_FORMAT,
+]
+
+
+def detect_bank_format(page_text: str) -> Optional[BankFormat]:
+    """Pick the template for a statement from the text of one page.
+
+    A bank-name fingerprint is only trusted if its template parses at least
+    one line, since narrations often name other banks ("NEFT from ICICI
+    BANK"). Otherwise every template is tried and the one that parses the
+    most lines wins. Returns None when nothing parses, e.g. on a cover page,
+    so callers can wait for a page with transactions before fixing the format.
+    """
+    lines = page_text.split("\n")
+    lowered = page_text.lower()
+    for fmt in BANK_FORMATS:
+        if any(fp in lowered for fp in fmt.fingerprints) and fmt.parse_lines(lines):
+            return fmt
+
+    best, best_hits = None, 0
+    for fmt in BANK_FORMATS:
+        hits = len(fmt.parse_lines(lines))
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+    return best
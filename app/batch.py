@@ -0,0 +1,192 @@
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.bank_formats import Row
+from app.models import Transaction
+from search.tokens import search_terms, tokenize
+
+
+# ------------------------------------------------------------------------------
+#                               COLUMNAR BATCH
+# ------------------------------------------------------------------------------
+class TransactionBatch:
+    """Parsed transactions held as columns rather than one object per row.
+
+    Dates are `datetime64[D]` (NaT for missing), amounts are float64 (NaN for
+    missing) and descriptions a plain list of str. Pydantic `Transaction`
+    objects are only built at the API edge via `to_transactions`. `pages`
+    holds the source page of each row for PDFs and is None otherwise.
+    `declared_opening` / `declared_closing` are the balances the statement
+    itself prints on its summary lines, when it has them.
+    """
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        descriptions: List[str],
+        debits: np.ndarray,
+        credits: np.ndarray,
+        balances: np.ndarray,
+        pages: Optional[np.ndarray] = None,
+        declared_opening: Optional[float] = None,
+        declared_closing: Optional[float] = None,
+    ):
+        self.dates = dates
+        self.descriptions = descriptions
+        self.debits = debits
+        self.credits = credits
+        self.balances = balances
+        self.pages = pages
+        self.declared_opening = declared_opening
+        self.declared_closing = declared_closing
+
+    def __len__(self) -> int:
+        return len(self.descriptions)
+
+    @classmethod
+    def empty(cls) -> "TransactionBatch":
+        return cls.from_rows([])
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Row],
+        pages: Optional[List[int]] = None,
+        declared: Optional[Dict[str, float]] = None,
+    ) -> "TransactionBatch":
+        rows = list(rows)
+        if not rows:
+            dates, descs, debits, credits, balances = (), (), (), (), ()
+        else:
+            dates, descs, debits, credits, balances = zip(*rows)
+
+        # numpy maps None to NaT / NaN for these dtypes
+        return cls(
+            dates=np.array(dates, dtype="datetime64[D]"),
+            descriptions=list(descs),
+            debits=np.array(debits, dtype=np.float64),
+            credits=np.array(credits, dtype=np.float64),
+            balances=np.array(balances, dtype=np.float64),
+            pages=np.array(pages, dtype=np.int32) if pages is not None else None,
+            declared_opening=(declared or {}).get("opening"),
+            declared_closing=(declared or {}).get("closing"),
+        )
+
+    @classmethod
+    def concat(cls, batches: Iterable["TransactionBatch"]) -> "TransactionBatch":
+        batches = list(batches)
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+
+        descriptions: List[str] = []
+        for b in batches:
+            descriptions.extend(b.descriptions)
+
+        return cls(
+            dates=np.concatenate([b.dates for b in batches]),
+            descriptions=descriptions,
+            debits=np.concatenate([b.debits for b in batches]),
+            credits=np.concatenate([b.credits for b in batches]),
+            balances=np.concatenate([b.balances for b in batches]),
+            pages=(
+                np.concatenate([b.pages for b in batches])
+                if all(b.pages is not None for b in batches) else None
+            ),
+            declared_opening=next((b.declared_opening for b in batches if b.declared_opening is not None), None),
+            declared_closing=next((b.declared_closing for b in reversed(batches) if b.declared_closing is not None), None),
+        )
+
+    # --------------------------------------------------------------------------
+    #                           ENCODERS
+    # --------------------------------------------------------------------------
+    def to_transactions(self) -> List[Transaction]:
+        # Values are already typed, so skip per-row validation
+        return [
+            Transaction.model_construct(
+                date=date_val,
+                description=desc,
+                debit=debit,
+                credit=credit,
+                balance=balance,
+            )
+            for date_val, desc, debit, credit, balance in zip(
+                self.dates.tolist(),
+                self.descriptions,
+                _nullable(self.debits),
+                _nullable(self.credits),
+                _nullable(self.balances),
+            )
+        ]
+
+    def natural_keys(self, account: str = "") -> List[str]:
+        """Stable per-row key: account, date, signed amount, description, running balance.
+
+        The same row in two overlapping statements gets the same key, which
+        the unique `txn_key` index uses to drop the second copy. Identical rows
+        within one statement get an occurrence number, so the n-th copy only
+        matches the n-th copy of another statement.
+        """
+        dates = np.datetime_as_string(self.dates, unit="D")
+        # Amounts in paise so float formatting can't change the key
+        amounts = np.rint((np.nan_to_num(self.credits) - np.nan_to_num(self.debits)) * 100).astype(np.int64)
+        balances = np.where(np.isnan(self.balances), 0, np.rint(self.balances * 100)).astype(np.int64)
+
+        keys = []
+        seen: Dict[str, int] = {}
+        for d, a, desc, b in zip(dates.tolist(), amounts.tolist(), self.descriptions, balances.tolist()):
+            base = f"{account}|{d}|{a}|{' '.join(tokenize(desc))}|{b}"
+            # Genuinely repeated rows (two identical ATM withdrawals without a
+            # balance) are told apart by their occurrence within the statement
+            nth = seen.get(base, 0)
+            seen[base] = nth + 1
+            raw = base if nth == 0 else f"{base}|{nth}"
+            keys.append(hashlib.sha1(raw.encode("utf-8")).hexdigest())
+        return keys
+
+    def to_documents(
+        self,
+        upload_id: float,
+        filename: str,
+        created_at: Optional[datetime] = None,
+        account: str = "",
+    ) -> List[dict]:
+        """Encode the batch as MongoDB documents in one pass over the columns."""
+        created_at = created_at or datetime.now()
+        # datetime64[ms] -> datetime.datetime, which BSON can store (date cannot)
+        dates = self.dates.astype("datetime64[ms]").tolist()
+
+        return [
+            {
+                "txn_key": key,
+                "account": account,
+                "upload_id": upload_id,
+                "filename": filename,
+                "date": date_val,
+                "description": desc,
+                "debit": debit,
+                "credit": credit,
+                "balance": balance,
+                "search_terms": search_terms(desc),
+                "created_at": created_at,
+            }
+            for key, date_val, desc, debit, credit, balance in zip(
+                self.natural_keys(account),
+                dates,
+                self.descriptions,
+                _nullable(self.debits),
+                _nullable(self.credits),
+                _nullable(self.balances),
+            )
+        ]
+
+
+def _nullable(values: np.ndarray) -> list:
+    """float64 column -> list of float with NaN replaced by None."""
+    out = values.astype(object)
+    out[np.isnan(values)] = None
+    return out.tolist()
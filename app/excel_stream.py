@@ -0,0 +1,92 @@
+import io
+from typing import Iterator, List, Optional, Sequence
+
+try:
+    # Rust-backed reader, used for legacy .xls when installed
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+from app.models import TRANSACTION_FIELDS
+
+
+HEADER_SCAN_ROWS = 50
+CHUNK_SIZE = 5000
+
+
+# ------------------------------------------------------------------------------
+#                               SHEET READERS
+# ------------------------------------------------------------------------------
+def _iter_xlsx_sheets(content: bytes) -> Iterator[Iterator[Sequence]]:
+    from openpyxl import load_workbook
+
+    # read_only streams rows from the sheet XML instead of building every cell
+    wb = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            yield ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _iter_xls_sheets(content: bytes) -> Iterator[Iterator[Sequence]]:
+    if CalamineWorkbook is not None:
+        wb = CalamineWorkbook.from_filelike(io.BytesIO(content))
+        for name in wb.sheet_names:
+            yield iter(wb.get_sheet_by_name(name).to_python())
+        return
+
+    import pandas as pd
+
+    sheets = pd.read_excel(io.BytesIO(content), sheet_name=None, header=None)
+    for df in sheets.values():
+        yield df.itertuples(index=False, name=None)
+
+
+# ------------------------------------------------------------------------------
+#                               ROW STREAM
+# ------------------------------------------------------------------------------
+def _find_header(rows: Iterator[Sequence]) -> Optional[List[int]]:
+    """Consume rows until the header row; return column indexes of TRANSACTION_FIELDS."""
+    for _, row in zip(range(HEADER_SCAN_ROWS), rows):
+        names = [str(c).lower().strip() if c is not None else "" for c in row]
+        if all(f in names for f in TRANSACTION_FIELDS):
+            return [names.index(f) for f in TRANSACTION_FIELDS]
+    return None
+
+
+def iter_excel_chunks(content: bytes, ext: str, chunk_size: int = CHUNK_SIZE) -> Iterator[List[tuple]]:
+    """Stream (date, description, debit, credit, balance) raw cell tuples in chunks.
+
+    Every sheet is scanned for its own header row, which may sit below a
+    title block at any offset. Sheets without one are skipped.
+    """
+    sheets = _iter_xlsx_sheets(content) if ext == "xlsx" else _iter_xls_sheets(content)
+    found_header = False
+    chunk: List[tuple] = []
+
+    for rows in sheets:
+        idx = _find_header(rows)
+        if idx is None:
+            continue
+        found_header = True
+        width = max(idx) + 1
+
+        for row in rows:
+            if not row:
+                continue
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            values = tuple(row[i] for i in idx)
+            # NaN != NaN catches blank cells coming through pandas
+            if all(v is None or v == "" or v != v for v in values):
+                continue
+            chunk.append(values)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+    if not found_header:
+        raise ValueError("Missing required columns")
+    if chunk:
+        yield chunk
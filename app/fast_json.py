@@ -0,0 +1,46 @@
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+# ------------------------------------------------------------------------------
+#                               FAST JSON RESPONSES
+# ------------------------------------------------------------------------------
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; bytes are passed through untouched.
+
+    Opt in per endpoint with `response_class=FastJSONResponse`, and return
+    `typed_json(...)` to skip the jsonable_encoder / response_model pass.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+def _orjson_default(obj: Any):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def typed_json(adapter: TypeAdapter, value: Any, status_code: int = 200) -> FastJSONResponse:
+    """Serialize `value` straight to JSON bytes with a pre-built TypeAdapter.
+
+    pydantic-core writes the bytes directly, without building an intermediate
+    dict and without FastAPI validating the return value against
+    `response_model` again. The route's response_model is still used for the
+    OpenAPI docs.
+    """
+    return FastJSONResponse(content=adapter.dump_json(value, by_alias=True), status_code=status_code)
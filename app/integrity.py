@@ -0,0 +1,120 @@
+from typing import Optional
+
+import numpy as np
+
+from app.batch import TransactionBatch
+from app.models import IntegrityIssue, IntegrityReport
+
+
+# Amounts agree when they differ by less than half a paisa
+TOLERANCE = 0.005
+MAX_ISSUES = 100
+
+
+# ------------------------------------------------------------------------------
+#                               INTEGRITY CHECKS
+# ------------------------------------------------------------------------------
+def check_integrity(batch: TransactionBatch) -> IntegrityReport:
+    """Verify a parsed statement as whole-column array operations.
+
+    - running balance: balance[i] == balance[i-1] - debit[i] + credit[i]
+    - totals: the opening / closing balances printed on the statement agree
+      with the rows, i.e. closing == opening - sum(debit) + sum(credit);
+      reported as "no declared totals" when the statement prints none
+    - dates never go backwards
+
+    Statements printed newest-first are checked in reverse. Reported row
+    indexes always refer to the batch as parsed.
+    """
+    n = len(batch)
+    if n == 0:
+        return IntegrityReport(
+            ok=True,
+            rows_checked=0,
+            balance_breaks=0,
+            date_order_breaks=0,
+            opening_balance=batch.declared_opening,
+            closing_balance=batch.declared_closing,
+        )
+
+    dated = ~np.isnat(batch.dates)
+    known_dates = batch.dates[dated]
+    order = np.arange(n)
+    if known_dates.size and known_dates[0] > known_dates[-1]:
+        order = order[::-1]
+
+    bal = batch.balances[order]
+    debit = np.nan_to_num(batch.debits[order])
+    credit = np.nan_to_num(batch.credits[order])
+    dates = batch.dates[order]
+
+    # Running balance continuity between neighbouring rows that both have a balance
+    expected = bal[:-1] - debit[1:] + credit[1:]
+    has_balance = ~np.isnan(bal[:-1]) & ~np.isnan(bal[1:])
+    balance_breaks = np.flatnonzero(has_balance & (np.abs(expected - bal[1:]) > TOLERANCE)) + 1
+
+    # Date order, ignoring rows without a date
+    both_dated = ~np.isnat(dates[:-1]) & ~np.isnat(dates[1:])
+    date_breaks = np.flatnonzero(both_dated & (dates[1:] < dates[:-1])) + 1
+
+    # Opening / closing totals against the balances the statement prints.
+    # Rows before the first balance count towards the opening, so a dropped
+    # first or last page shows up as a mismatch.
+    with_balance = np.flatnonzero(~np.isnan(bal))
+    total_debit = float(debit.sum())
+    total_credit = float(credit.sum())
+    computed_opening = None
+    if with_balance.size:
+        first = with_balance[0]
+        computed_opening = float(bal[first] + debit[:first + 1].sum() - credit[:first + 1].sum())
+
+    opening = batch.declared_opening if batch.declared_opening is not None else computed_opening
+    computed_closing = opening - total_debit + total_credit if opening is not None else None
+
+    checks = []
+    if batch.declared_opening is not None and computed_opening is not None:
+        checks.append(abs(batch.declared_opening - computed_opening) <= TOLERANCE)
+    if batch.declared_closing is not None and computed_closing is not None:
+        checks.append(abs(batch.declared_closing - computed_closing) <= TOLERANCE)
+    if not checks:
+        totals_check = "no declared totals"
+    else:
+        totals_check = "match" if all(checks) else "mismatch"
+
+    issues = []
+    for pos, kind in _first_issues(balance_breaks, date_breaks):
+        row = int(order[pos])
+        issue = IntegrityIssue(row=row, kind=kind)
+        if batch.pages is not None:
+            issue.page = int(batch.pages[row])
+        if kind == "balance_break":
+            issue.expected = round(float(expected[pos - 1]), 2)
+            issue.actual = float(bal[pos])
+        issues.append(issue)
+
+    return IntegrityReport(
+        ok=not balance_breaks.size and not date_breaks.size and totals_check != "mismatch",
+        rows_checked=n,
+        balance_breaks=int(balance_breaks.size),
+        date_order_breaks=int(date_breaks.size),
+        opening_balance=batch.declared_opening,
+        closing_balance=batch.declared_closing,
+        computed_opening=_round(computed_opening),
+        computed_closing=_round(computed_closing),
+        total_debit=round(total_debit, 2),
+        total_credit=round(total_credit, 2),
+        totals_check=totals_check,
+        issues=issues,
+    )
+
+
+def _first_issues(balance_breaks: np.ndarray, date_breaks: np.ndarray):
+    """Earliest MAX_ISSUES break positions across both checks, in row order."""
+    positions = np.concatenate([balance_breaks[:MAX_ISSUES], date_breaks[:MAX_ISSUES]])
+    kinds = ["balance_break"] * min(balance_breaks.size, MAX_ISSUES) + ["date_order"] * min(date_breaks.size, MAX_ISSUES)
+    ranked = np.argsort(positions, kind="stable")[:MAX_ISSUES]
+    return [(int(positions[i]), kinds[i]) for i in ranked]
+
+
+def _round(val: Optional[float]) -> Optional[float]:
+    return round(val, 2) if val is not None else None
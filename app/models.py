@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional, List
 from datetime import date
 
@@ -10,8 +10,55 @@ class Transaction(BaseModel):
     credit: Optional[float]
     balance: Optional[float]
 
+TRANSACTION_FIELDS = ['date', 'description', 'debit', 'credit', 'balance']
+
+# ---------- Integrity Report ----------
+class IntegrityIssue(BaseModel):
+    row: int                    # index into the parsed transactions
+    page: Optional[int] = None  # source page, PDFs only
+    kind: str                   # balance_break, date_order
+    expected: Optional[float] = None
+    actual: Optional[float] = None
+
+
+class IntegrityReport(BaseModel):
+    ok: bool
+    rows_checked: int
+    balance_breaks: int
+    date_order_breaks: int
+    opening_balance: Optional[float] = None    # as printed on the statement
+    closing_balance: Optional[float] = None    # as printed on the statement
+    computed_opening: Optional[float] = None   # worked back from the first row's balance
+    computed_closing: Optional[float] = None   # opening - total_debit + total_credit
+    total_debit: float = 0
+    total_credit: float = 0
+    totals_check: str = "no declared totals"   # match, mismatch, no declared totals
+    issues: List[IntegrityIssue] = []
+
 # ---------- Response Model ----------
 class UploadResponse(BaseModel):
     filename: str
+    upload_id: Optional[float] = None
     transactions: List[Transaction]
-    message: Optional[str]
\ No newline at end of file
+    integrity: Optional[IntegrityReport] = None
+    message: Optional[str]
+
+# ---------- Batch Upload Models ----------
+class BatchFileResult(BaseModel):
+    filename: str
+    upload_id: Optional[float] = None
+    transactions: int = 0
+    duplicates: int = 0
+    integrity: Optional[IntegrityReport] = None
+    error: Optional[str] = None
+
+
+class BatchUploadResponse(BaseModel):
+    files: List[BatchFileResult]
+    total_transactions: int
+    message: Optional[str]
+
+
+# ---------- Pre-built serializers (see app.fast_json) ----------
+UPLOAD_RESPONSE_ADAPTER = TypeAdapter(UploadResponse)
+BATCH_UPLOAD_RESPONSE_ADAPTER = TypeAdapter(BatchUploadResponse)
@@ -0,0 +1,34 @@
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.parsers import parse_statement
+
+
+# ------------------------------------------------------------------------------
+#                               PARSING POOL
+# ------------------------------------------------------------------------------
+PARSE_POOL_WORKERS = int(os.getenv("PARSE_POOL_WORKERS", str(os.cpu_count() or 2)))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PARSE_POOL_WORKERS)
+    return _pool
+
+
+def submit_parse(ext: str, content: bytes) -> asyncio.Future:
+    """Start parsing in the pool right away; await the returned future for the batch."""
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(get_parse_pool(), parse_statement, ext, content)
+
+
+def shutdown_parse_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
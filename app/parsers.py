@@ -0,0 +1,120 @@
+import io
+import pdfplumber
+import pandas as pd
+from datetime import datetime
+
+from app.models import TRANSACTION_FIELDS
+from app.bank_formats import note_declared, summary_kind
+from app.pdf_tables import extract_pdf_rows
+from app.excel_stream import iter_excel_chunks
+from app.batch import TransactionBatch
+
+# Parsers are plain synchronous functions with no database or event loop
+# dependencies, so they can run in a worker thread or a separate process.
+
+SUPPORTED_EXTENSIONS = ["pdf", "csv", "xlsx", "xls"]
+
+
+def parse_statement(ext: str, content: bytes) -> TransactionBatch:
+    if ext == "pdf":
+        return parse_pdf(content)
+    elif ext == "csv":
+        return parse_csv(content)
+    elif ext in ["xlsx", "xls"]:
+        return parse_excel(content, ext)
+    raise ValueError(f"Unsupported file type: {ext}")
+
+
+# ------------------------------------------------------------------------------
+#                               PDF PARSER
+# ------------------------------------------------------------------------------
+def parse_pdf(content: bytes) -> TransactionBatch:
+    pdf_file = io.BytesIO(content)
+
+    try:
+        with pdfplumber.open(pdf_file) as pdf:
+            rows, pages, declared = extract_pdf_rows(pdf)
+
+        return TransactionBatch.from_rows(rows, pages, declared)
+
+    except Exception as e:
+        raise ValueError(f"PDF parse error: {str(e)}")
+
+
+# ------------------------------------------------------------------------------
+#                               CSV PARSER
+# ------------------------------------------------------------------------------
+def parse_csv(content: bytes) -> TransactionBatch:
+    try:
+        df = pd.read_csv(io.BytesIO(content))
+        df.columns = df.columns.str.lower().str.strip()
+        return build_batch_from_df(df)
+
+    except Exception as e:
+        raise ValueError(f"CSV parse error: {str(e)}")
+
+
+# ------------------------------------------------------------------------------
+#                               EXCEL PARSER
+# ------------------------------------------------------------------------------
+def parse_excel(content: bytes, ext: str = "xlsx") -> TransactionBatch:
+    try:
+        return TransactionBatch.concat(
+            build_batch_from_rows(chunk)
+            for chunk in iter_excel_chunks(content, ext)
+        )
+
+    except Exception as e:
+        raise ValueError(f"Excel parse error: {str(e)}")
+
+
+# ------------------------------------------------------------------------------
+#                               HELPER FOR CSV + EXCEL
+# ------------------------------------------------------------------------------
+def build_batch_from_df(df) -> TransactionBatch:
+    if not all(c in df.columns for c in TRANSACTION_FIELDS):
+        raise ValueError("Missing required columns")
+
+    return build_batch_from_rows(
+        df[TRANSACTION_FIELDS].itertuples(index=False, name=None)
+    )
+
+
+def build_batch_from_rows(rows) -> TransactionBatch:
+    parsed = []
+    declared = {}
+    for date_val, desc, debit, credit, balance in rows:
+        desc = str(desc)
+        debit, credit = parse_number(debit), parse_number(credit)
+        # "Opening Balance" / "Closing Balance" rows are totals, not transactions;
+        # a row that moves money ("Closing balance adjustment fee") is kept
+        kind = summary_kind(desc) if debit is None and credit is None else None
+        if kind is not None:
+            note_declared(declared, kind, parse_number(balance))
+            continue
+        parsed.append((
+            parse_date(date_val),
+            desc,
+            debit,
+            credit,
+            parse_number(balance),
+        ))
+    return TransactionBatch.from_rows(parsed, declared=declared)
+
+
+def parse_date(val):
+    if pd.isna(val): return None
+    if isinstance(val, datetime): return val.date()
+
+    for fmt in ["%d/%m/%Y", "%Y-%m-%d", "%m/%d/%Y"]:
+        try:
+            return datetime.strptime(str(val), fmt).date()
+        except:
+            pass
+    return None
+
+
+def parse_number(val):
+    if pd.isna(val) or val == "-": return None
+    try: return float(str(val).replace(",", ""))
+    except: return None
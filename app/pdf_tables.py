@@ -0,0 +1,271 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.bank_formats import DEFAULT_FORMAT, BankFormat, Row, declared_balances, detect_bank_format, note_declared
+
+
+# ------------------------------------------------------------------------------
+#                               COLUMN LAYOUT
+# ------------------------------------------------------------------------------
+HEADER_ALIASES: Dict[str, str] = {
+    "date": "date",
+    "description": "description",
+    "narration": "description",
+    "particulars": "description",
+    "details": "description",
+    "debit": "debit",
+    "withdrawal": "debit",
+    "withdrawals": "debit",
+    "credit": "credit",
+    "deposit": "credit",
+    "deposits": "credit",
+    "balance": "balance",
+}
+
+_AMOUNT_TOKEN = re.compile(r"^-?[\d,]+\.\d{2}$")
+_FALLBACK_DATES = BankFormat(
+    name="fallback",
+    line_pattern=re.compile(r"$^"),
+    date_formats=[
+        "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%m-%y",
+        "%d %b %Y", "%d-%b-%Y", "%d-%b-%y", "%Y-%m-%d", "%b %d, %Y",
+    ],
+)
+
+Word = dict
+Line = List[Word]
+
+
+class TableLayout:
+    """Column boundaries learned from the header row of the first transaction page.
+
+    Each column starts at the left edge of its header. Text is assigned by its
+    left edge and amounts by their right edge, so right-aligned numbers land in
+    the column whose header sits above them.
+    """
+
+    def __init__(self, columns: List[Tuple[str, float]]):
+        self.columns = sorted(columns, key=lambda c: c[1])
+        starts = [x0 for _, x0 in self.columns]
+        date_idx = [name for name, _ in self.columns].index("date")
+        self.date_x0 = starts[date_idx]
+        self.date_x1 = starts[date_idx + 1] if date_idx + 1 < len(starts) else None
+
+    def column_for(self, word: Word) -> str:
+        anchor = word["x1"] if _AMOUNT_TOKEN.match(word["text"]) else word["x0"]
+        name = self.columns[0][0]
+        for col, x0 in self.columns:
+            if anchor + 1 < x0:
+                break
+            name = col
+        return name
+
+    def split(self, line: Line) -> Dict[str, str]:
+        cells: Dict[str, List[str]] = {}
+        for word in line:
+            cells.setdefault(self.column_for(word), []).append(word["text"])
+        return {name: " ".join(texts) for name, texts in cells.items()}
+
+    def probe(self, lines: List[Line], bank_format: BankFormat) -> bool:
+        """Cheap check whether a page has any date in the date column.
+
+        Only the words under the date header are looked at, with the same
+        date parsing as the rows themselves.
+        """
+        x0 = self.date_x0 - 2
+        x1 = float("inf") if self.date_x1 is None else self.date_x1
+        for line in lines:
+            cell = " ".join(w["text"] for w in line if x0 <= w["x0"] < x1)
+            # Every accepted date format has digits; skip prose without trying them
+            if any(c.isdigit() for c in cell) and _parse_date(cell, bank_format) is not None:
+                return True
+        return False
+
+    def parse_lines(self, lines: List[Line], bank_format: BankFormat) -> List[Row]:
+        rows: List[list] = []
+        previous: Optional[list] = None
+        last_bottom = 0.0
+
+        for line in lines:
+            if _is_header(line):
+                # Header repeated at the top of a page
+                previous = None
+                continue
+
+            cells = self.split(line)
+            top = min(w["top"] for w in line)
+            height = max(w["bottom"] - w["top"] for w in line)
+            date_val = _parse_date(cells.get("date", ""), bank_format)
+            desc = cells.get("description", "").strip()
+
+            amounts = [
+                _parse_cell_amount(cells.get(name))
+                for name in ("debit", "credit", "balance")
+            ]
+
+            if date_val is not None and any(a is not None for a in amounts):
+                if bank_format.skip_pattern is not None and bank_format.skip_pattern.search(desc):
+                    previous = None
+                    continue
+                previous = [date_val, desc, *amounts]
+                rows.append(previous)
+
+            elif (
+                previous is not None
+                and desc
+                and set(cells) == {"description"}
+                and top - last_bottom < height * 1.5
+            ):
+                # Wrapped narration: join it to the transaction above
+                previous[1] = f"{previous[1]} {desc}".strip()
+
+            else:
+                previous = None
+                continue
+
+            last_bottom = max(w["bottom"] for w in line)
+
+        return [tuple(r) for r in rows]
+
+
+def _header_fields(line: Line) -> set:
+    return {HEADER_ALIASES.get(w["text"].lower().strip(".:()")) for w in line} - {None}
+
+
+def _is_header(line: Line) -> bool:
+    fields = _header_fields(line)
+    return {"date", "description", "balance"} <= fields and bool(fields & {"debit", "credit"})
+
+
+def find_layout(lines: List[Line]) -> Optional[TableLayout]:
+    for line in lines:
+        columns: List[Tuple[str, float]] = []
+        seen = set()
+        col_x0, col_name, prev_x1 = None, None, None
+
+        for word in line:
+            gap = word["x0"] - prev_x1 if prev_x1 is not None else None
+            if gap is not None and gap > (word["bottom"] - word["top"]):
+                columns.append((col_name or "other", col_x0))
+                col_x0, col_name = None, None
+            if col_x0 is None:
+                col_x0 = word["x0"]
+
+            field = HEADER_ALIASES.get(word["text"].lower().strip(".:()"))
+            if field and field not in seen:
+                if col_name is not None:
+                    # Two known headers set close together: split them anyway
+                    columns.append((col_name, col_x0))
+                    col_x0 = word["x0"]
+                col_name = field
+                seen.add(field)
+            prev_x1 = word["x1"]
+
+        if col_x0 is not None:
+            columns.append((col_name or "other", col_x0))
+
+        if {"date", "description", "balance"} <= seen and seen & {"debit", "credit"}:
+            return TableLayout(columns)
+
+    return None
+
+
+# ------------------------------------------------------------------------------
+#                               PAGE EXTRACTION
+# ------------------------------------------------------------------------------
+def extract_pdf_rows(pdf) -> Tuple[List[Row], List[int], Dict[str, float]]:
+    """Extract statement rows from an open pdfplumber document.
+
+    Each page is read once as positioned words. Once a header row is found
+    its column layout is cached, and later pages are probed on the date
+    column: a page with no date there (cover, summary or advertisement page)
+    is skipped without any row parsing, and is only scanned for printed
+    balance lines and for a new header row. Pages seen before any header
+    fall back to the line templates.
+
+    Returns the rows, in parallel the 1-based page each row came from, and the
+    opening / closing balances printed on the statement's summary lines.
+    """
+    rows: List[Row] = []
+    pages: List[int] = []
+    declared: Dict[str, float] = {}
+    layout: Optional[TableLayout] = None
+    bank_format: Optional[BankFormat] = None
+
+    for page_no, page in enumerate(pdf.pages, start=1):
+        words = page.extract_words()
+        if not words:
+            continue
+
+        lines = _group_lines(words)
+        texts = [_line_text(l) for l in lines]
+        for text in texts:
+            for kind, amount in declared_balances(text):
+                note_declared(declared, kind, amount)
+
+        if layout is not None and not layout.probe(lines, bank_format or DEFAULT_FORMAT):
+            # Nothing in the date column; use the page only if it starts a new table
+            new_layout = find_layout(lines)
+            if new_layout is None:
+                continue
+            layout = new_layout
+
+        page_format = bank_format
+        if page_format is None:
+            # Only settle on a format once a page actually has matching rows
+            bank_format = detect_bank_format("\n".join(texts))
+            page_format = bank_format or DEFAULT_FORMAT
+        if layout is None:
+            layout = find_layout(lines)
+
+        if layout is None:
+            page_rows = page_format.parse_lines(texts)
+        else:
+            page_rows = layout.parse_lines(lines, page_format)
+        rows.extend(page_rows)
+        pages.extend([page_no] * len(page_rows))
+
+    return rows, pages, declared
+
+
+def _group_lines(words: List[Word], tolerance: float = 3) -> List[Line]:
+    lines: List[Line] = []
+    current: Line = []
+    current_top = None
+
+    for word in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if current_top is not None and abs(word["top"] - current_top) > tolerance:
+            lines.append(sorted(current, key=lambda w: w["x0"]))
+            current = []
+        if not current:
+            current_top = word["top"]
+        current.append(word)
+
+    if current:
+        lines.append(sorted(current, key=lambda w: w["x0"]))
+    return lines
+
+
+def _line_text(line: Line) -> str:
+    return " ".join(w["text"] for w in line)
+
+
+def _parse_date(cell: str, bank_format: BankFormat):
+    if not cell:
+        return None
+    tokens = cell.split()
+    # The date column may also hold a value date; try the leading tokens first
+    for candidate in (cell, " ".join(tokens[:3]), tokens[0]):
+        val = bank_format.parse_date(candidate) or _FALLBACK_DATES.parse_date(candidate)
+        if val is not None:
+            return val
+    return None
+
+
+def _parse_cell_amount(cell: Optional[str]) -> Optional[float]:
+    if not cell:
+        return None
+    for token in cell.split():
+        if _AMOUNT_TOKEN.match(token):
+            return float(token.replace(",", ""))
+    return None
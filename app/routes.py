@@ -1,17 +1,106 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from app.services import process_statement
-from app.models import UploadResponse
+import zipfile
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request
+from app.services import (
+    process_statement_content,
+    process_statement_batch,
+    open_zip_statements,
+    iter_statement_sources,
+)
+from app.models import (
+    UploadResponse,
+    BatchUploadResponse,
+    UPLOAD_RESPONSE_ADAPTER,
+    BATCH_UPLOAD_RESPONSE_ADAPTER,
+)
+from app.fast_json import FastJSONResponse, typed_json
+from app.admission import (
+    BATCH_MAX_FILES,
+    UPLOAD_MAX_FILE_BYTES,
+    MULTIPART_OVERHEAD,
+    UPLOAD_MAX_QUEUED_BYTES,
+    upload_admission,
+    check_declared_size,
+    read_upload,
+)
 
 
 router = APIRouter(prefix="/api")
 
 
-@router.post("/upload-statement", response_model=UploadResponse)
-async def upload_statement(file: UploadFile = File(...)):
-    """Endpoint to upload bank statement file. For now the service returns a placeholder result.
-    The actual parsing and tallying logic will live in `app.services.process_statement`.
+@router.post("/upload-statement", response_model=UploadResponse, response_class=FastJSONResponse)
+async def upload_statement(
+    request: Request,
+    file: UploadFile = File(...),
+    account: Optional[str] = Form(None),
+):
+    """Upload one bank statement; it is parsed, checked, stored and returned with its rows.
+    Parsing and storage live in `app.services.process_statement_content`.
+
+    Uploads go through the worker's admission controller: oversized files get a 413,
+    and a saturated worker answers 429 with Retry-After instead of queueing without bound.
     """
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file uploaded")
-    result = await process_statement(file)
-    return result
\ No newline at end of file
+
+    # Content-Length covers the whole multipart body, so allow the same overhead as
+    # the middleware; read_upload holds the file itself to UPLOAD_MAX_FILE_BYTES.
+    # Without a Content-Length, reserve the worst case.
+    declared = check_declared_size(request.headers.get("content-length"), UPLOAD_MAX_FILE_BYTES + MULTIPART_OVERHEAD)
+    async with upload_admission.admit(declared or UPLOAD_MAX_FILE_BYTES):
+        content = await read_upload(file)
+        result = await process_statement_content(file.filename, content, account or "")
+    return typed_json(UPLOAD_RESPONSE_ADAPTER, result)
+
+
+@router.post("/upload-statements", response_model=BatchUploadResponse, response_class=FastJSONResponse)
+async def upload_statements(
+    files: List[UploadFile] = File(...),
+    account: Optional[str] = Form(None),
+):
+    """Upload several statements at once, as separate files and/or ZIP archives.
+
+    Every statement is parsed in parallel and gets its own upload_id; the
+    response carries a per-file summary instead of the parsed rows.
+    """
+    if not files or len(files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Send between 1 and {BATCH_MAX_FILES} files")
+
+    plain = [f for f in files if f.filename and not f.filename.lower().endswith(".zip")]
+    archives = []
+    try:
+        for file in files:
+            if file.filename and file.filename.lower().endswith(".zip"):
+                archives.append(open_zip_statements(file.file, UPLOAD_MAX_FILE_BYTES))
+
+        # Count archive members up front too, so nothing is stored from a batch
+        # that turns out to be over the file limit
+        if len(plain) + sum(len(members) for _, members in archives) > BATCH_MAX_FILES:
+            raise HTTPException(status_code=400, detail=f"Batch holds more than {BATCH_MAX_FILES} files")
+
+        # The body is already spooled, so reserve what the batch can hold in memory:
+        # plain files as sent plus every archive member fully expanded, capped
+        # across the whole request
+        total = sum(f.size or UPLOAD_MAX_FILE_BYTES for f in plain)
+        total += sum(info.file_size for _, members in archives for info in members)
+        if total > UPLOAD_MAX_QUEUED_BYTES:
+            raise HTTPException(status_code=413, detail=f"Batch expands beyond {UPLOAD_MAX_QUEUED_BYTES} bytes")
+
+        async with upload_admission.admit(total):
+            result = await process_statement_batch(
+                iter_statement_sources(plain, archives),
+                max_files=BATCH_MAX_FILES,
+                account=account or "",
+            )
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Upload contains an invalid ZIP archive")
+    finally:
+        for zf, _ in archives:
+            zf.close()
+    return typed_json(BATCH_UPLOAD_RESPONSE_ADAPTER, result)
+
+
+@router.get("/upload-stats")
+async def upload_stats():
+    """Admission counters for tuning the upload limits: queue wait times and rejections."""
+    return upload_admission.stats()
@@ -1,14 +1,19 @@
 import os
-import io
-import re
-import pdfplumber
-import pandas as pd
+import asyncio
+import zipfile
 from fastapi import UploadFile, HTTPException
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, BinaryIO, List, Set, Tuple
 
 from motor.motor_asyncio import AsyncIOMotorClient
-from app.models import Transaction, UploadResponse
+from pymongo import IndexModel, UpdateOne, ASCENDING, DESCENDING, TEXT
+from pymongo.errors import BulkWriteError
+from app.models import UploadResponse, BatchFileResult, BatchUploadResponse
+from app.batch import TransactionBatch
+from app.integrity import check_integrity
+from app.admission import read_upload
+from app.parse_pool import PARSE_POOL_WORKERS, submit_parse
+from app.parsers import SUPPORTED_EXTENSIONS
 
 
 # ------------------------------------------------------------------------------
@@ -21,69 +26,97 @@ db = mongo_client["mydb"]
 transactions_collection = db["transactions"]
 
 
-async def save_transactions_to_db(transactions, filename: str):
+async def ensure_transaction_indexes():
+    await transactions_collection.create_indexes([
+        IndexModel([("description", TEXT)], name="description_text"),
+        IndexModel([("search_terms", ASCENDING), ("date", DESCENDING)], name="search_terms_date"),
+        # Ordered reads (exports, reconciliation) walk these instead of sorting in memory
+        IndexModel([("date", ASCENDING)], name="date"),
+        IndexModel([("upload_id", ASCENDING), ("date", ASCENDING)], name="upload_id_date"),
+        # Rows stored before natural keys existed have no txn_key
+        IndexModel(
+            [("txn_key", ASCENDING)],
+            name="txn_key_unique",
+            unique=True,
+            partialFilterExpression={"txn_key": {"$exists": True}},
+        ),
+    ])
+
+
+_last_upload_id = 0.0
+
+
+def new_upload_id() -> float:
+    """Timestamp-based upload id, bumped when two uploads land in the same microsecond."""
+    global _last_upload_id
     upload_id = datetime.now().timestamp()
+    if upload_id <= _last_upload_id:
+        upload_id = _last_upload_id + 1e-6
+    _last_upload_id = upload_id
+    return upload_id
 
-    docs = []
-    for txn in transactions:
 
-        # Convert datetime.date → datetime.datetime
-        date_val = (
-            datetime.combine(txn.date, datetime.min.time())
-            if txn.date else None
-        )
+async def upsert_transactions(docs: List[dict]) -> Set[int]:
+    """Store docs in one unordered bulk upsert keyed on `txn_key`.
 
-        docs.append({
-            "upload_id": upload_id,
-            "filename": filename,
-            "date": date_val,          # <-- now valid for MongoDB
-            "description": txn.description,
-            "debit": txn.debit,
-            "credit": txn.credit,
-            "balance": txn.balance,
-            "created_at": datetime.now()
-        })
+    Rows already stored from an overlapping statement are left untouched.
+    Returns the positions in `docs` that were actually inserted.
+    """
+    if not docs:
+        return set()
 
-    if docs:
-        await transactions_collection.insert_many(docs)
+    ops = [
+        UpdateOne({"txn_key": doc["txn_key"]}, {"$setOnInsert": doc}, upsert=True)
+        for doc in docs
+    ]
+    try:
+        result = await transactions_collection.bulk_write(ops, ordered=False)
+        return set(result.upserted_ids)
+    except BulkWriteError as e:
+        # Two concurrent uploads racing on the same key: the other one won
+        errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+        if errors:
+            raise
+        return {u["index"] for u in e.details.get("upserted", [])}
 
-    return upload_id
+
+async def save_transactions_to_db(batch: TransactionBatch, filename: str, account: str = ""):
+    upload_id = new_upload_id()
+
+    docs = batch.to_documents(upload_id, filename, account=account)
+    inserted = await upsert_transactions(docs)
+
+    return upload_id, len(inserted)
 
 
 
 # ------------------------------------------------------------------------------
 #                               MAIN PROCESS FUNCTION
 # ------------------------------------------------------------------------------
-async def process_statement(file: UploadFile) -> UploadResponse:
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No filename provided")
-
-    content = await file.read()
-
+async def process_statement_content(filename: str, content: bytes, account: str = "") -> UploadResponse:
     # Debug save
     os.makedirs("/tmp/uploads", exist_ok=True)
-    with open(f"/tmp/uploads/{file.filename}", "wb") as f:
+    with open(f"/tmp/uploads/{filename}", "wb") as f:
         f.write(content)
 
-    ext = file.filename.lower().split('.')[-1]
+    ext = filename.lower().split('.')[-1]
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(400, f"Unsupported file type: {ext}")
 
     try:
-        if ext == "pdf":
-            transactions = await parse_pdf(content)
-        elif ext == "csv":
-            transactions = await parse_csv(content)
-        elif ext in ["xlsx", "xls"]:
-            transactions = await parse_excel(content)
-        else:
-            raise HTTPException(400, f"Unsupported file type: {ext}")
+        # Parse off the event loop, in the shared parsing pool
+        batch = await submit_parse(ext, content)
 
         # SAVE TO DATABASE
-        await save_transactions_to_db(transactions, file.filename)
+        upload_id, inserted = await save_transactions_to_db(batch, filename, account)
 
         return UploadResponse(
-            filename=file.filename,
-            transactions=transactions,
-            message=f"Parsed and saved {len(transactions)} transactions"
+            filename=filename,
+            upload_id=upload_id,
+            transactions=batch.to_transactions(),
+            # Report only; rows are stored even if the statement doesn't balance
+            integrity=check_integrity(batch),
+            message=f"Parsed {len(batch)} transactions, saved {inserted} new ({len(batch) - inserted} already stored)"
         )
 
     except Exception as e:
@@ -91,128 +124,119 @@ async def process_statement(file: UploadFile) -> UploadResponse:
 
 
 # ------------------------------------------------------------------------------
-#                               PDF PARSER
+#                               BATCH UPLOAD
 # ------------------------------------------------------------------------------
-async def parse_pdf(content: bytes) -> List[Transaction]:
-    transactions = []
-    pdf_file = io.BytesIO(content)
-
+ZipMembers = Tuple[zipfile.ZipFile, List[zipfile.ZipInfo]]
+
+
+def open_zip_statements(fileobj: BinaryIO, max_file_bytes: int) -> ZipMembers:
+    """Open a ZIP and list its statement members from the central directory.
+
+    Nothing is decompressed here, so the caller can reserve the expanded size
+    before unpacking. zipfile never reads a member past its declared size, so
+    these sizes bound what decompression will produce.
+    """
+    zf = zipfile.ZipFile(fileobj)
+    members = [
+        info for info in zf.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and not os.path.basename(info.filename).startswith(".")
+    ]
+    for info in members:
+        if info.file_size > max_file_bytes:
+            zf.close()
+            raise HTTPException(413, f"{os.path.basename(info.filename)} exceeds {max_file_bytes} bytes")
+    return zf, members
+
+
+def _read_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    with zf.open(info) as member:
+        return member.read()
+
+
+async def iter_statement_sources(
+    files: List[UploadFile], archives: List[ZipMembers]
+) -> AsyncIterator[Tuple[str, bytes]]:
+    """Yield (filename, content) one statement at a time, plain files first.
+
+    Archive members are decompressed in a worker thread, only when the batch
+    is ready for them.
+    """
+    for file in files:
+        yield file.filename, await read_upload(file)
+    for zf, members in archives:
+        for info in members:
+            yield os.path.basename(info.filename), await asyncio.to_thread(_read_member, zf, info)
+
+
+async def _ingest_one(filename: str, content: bytes, account: str) -> BatchFileResult:
+    ext = filename.lower().split('.')[-1]
+    if ext not in SUPPORTED_EXTENSIONS:
+        return BatchFileResult(filename=filename, error=f"Unsupported file type: {ext}")
     try:
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    lines = text.split("\n")
-                    transactions.extend(parse_transaction_lines(lines))
-
-        return transactions
-
+        batch = await submit_parse(ext, content)
     except Exception as e:
-        raise ValueError(f"PDF parse error: {str(e)}")
-
-
-# ------------------------------------------------------------------------------
-#                               PDF LINE PARSER
-# ------------------------------------------------------------------------------
-def parse_transaction_lines(lines: List[str]) -> List[Transaction]:
-    txns = []
-
-    pattern = re.compile(
-        r"^(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d,]+\.\d{2}|-)\s+([\d,]+\.\d{2}|-)\s+([\d,]+\.\d{2})$"
+        return BatchFileResult(filename=filename, error=str(e))
+    del content
+
+    upload_id, inserted = await save_transactions_to_db(batch, filename, account)
+    return BatchFileResult(
+        filename=filename,
+        upload_id=upload_id,
+        transactions=len(batch),
+        duplicates=len(batch) - inserted,
+        integrity=check_integrity(batch),
     )
 
-    for line in lines:
-        line = line.strip()
-        if not line or any(x in line.lower() for x in [
-            "opening", "closing", "balance", "date", "page"
-        ]):
-            continue
-
-        m = pattern.match(line)
-        if m:
-            date_str, desc, debit, credit, balance = m.groups()
-
-            try:
-                date_val = datetime.strptime(date_str, "%d/%m/%Y").date()
-            except:
-                continue
-
-            debit = None if debit == "-" else float(debit.replace(",", ""))
-            credit = None if credit == "-" else float(credit.replace(",", ""))
-            balance = float(balance.replace(",", ""))
-
-            txns.append(Transaction(
-                date=date_val,
-                description=desc.strip(),
-                debit=debit,
-                credit=credit,
-                balance=balance
-            ))
 
-    return txns
+async def process_statement_batch(
+    sources: AsyncIterator[Tuple[str, bytes]], max_files: int = 100, account: str = ""
+) -> BatchUploadResponse:
+    """Parse many statements in parallel, storing each one as soon as it is parsed.
 
+    At most PARSE_POOL_WORKERS files are in flight at a time: the next source
+    is only read or decompressed once a slot frees up, so the batch never
+    holds more than a pool's worth of raw content, parsed rows or documents.
+    Files are stored as they finish, so callers should check the file count
+    before starting; `max_files` is only a backstop.
+    """
+    slots = asyncio.Semaphore(PARSE_POOL_WORKERS)
+    tasks: List[asyncio.Task] = []
 
-# ------------------------------------------------------------------------------
-#                               CSV PARSER
-# ------------------------------------------------------------------------------
-async def parse_csv(content: bytes) -> List[Transaction]:
-    try:
-        df = pd.read_csv(io.BytesIO(content))
-        df.columns = df.columns.str.lower().str.strip()
-        return build_transactions_from_df(df)
-
-    except Exception as e:
-        raise ValueError(f"CSV parse error: {str(e)}")
-
-
-# ------------------------------------------------------------------------------
-#                               EXCEL PARSER
-# ------------------------------------------------------------------------------
-async def parse_excel(content: bytes) -> List[Transaction]:
-    try:
-        df = pd.read_excel(io.BytesIO(content))
-        df.columns = df.columns.str.lower().str.strip()
-        return build_transactions_from_df(df)
-
-    except Exception as e:
-        raise ValueError(f"Excel parse error: {str(e)}")
-
-
-# ------------------------------------------------------------------------------
-#                               HELPER FOR CSV + EXCEL
-# ------------------------------------------------------------------------------
-def build_transactions_from_df(df) -> List[Transaction]:
-    required = ['date', 'description', 'debit', 'credit', 'balance']
-    if not all(c in df.columns for c in required):
-        raise ValueError("Missing required columns")
-
-    txns = []
-
-    for _, row in df.iterrows():
-        txns.append(Transaction(
-            date=parse_date(row['date']),
-            description=str(row['description']),
-            debit=parse_number(row['debit']),
-            credit=parse_number(row['credit']),
-            balance=parse_number(row['balance'])
-        ))
-
-    return txns
-
-
-def parse_date(val):
-    if pd.isna(val): return None
-    if isinstance(val, datetime): return val.date()
-
-    for fmt in ["%d/%m/%Y", "%Y-%m-%d", "%m/%d/%Y"]:
+    async def run(filename: str, content: bytes) -> BatchFileResult:
         try:
-            return datetime.strptime(str(val), fmt).date()
-        except:
-            pass
-    return None
-
+            return await _ingest_one(filename, content, account)
+        finally:
+            slots.release()
 
-def parse_number(val):
-    if pd.isna(val) or val == "-": return None
-    try: return float(str(val).replace(",", ""))
-    except: return None
+    try:
+        count = 0
+        while True:
+            await slots.acquire()
+            try:
+                filename, content = await sources.__anext__()
+            except StopAsyncIteration:
+                slots.release()
+                break
+            count += 1
+            if count > max_files:
+                slots.release()
+                raise HTTPException(400, f"Batch holds more than {max_files} files")
+            tasks.append(asyncio.create_task(run(filename, content)))
+            del content
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    parsed_files = sum(1 for r in results if r.error is None)
+    total_rows = sum(r.transactions for r in results)
+    inserted = total_rows - sum(r.duplicates for r in results)
+    return BatchUploadResponse(
+        files=results,
+        total_transactions=inserted,
+        message=f"Parsed {parsed_files} of {len(results)} files, saved {inserted} new transactions"
+                f" ({total_rows - inserted} already stored)"
+    )
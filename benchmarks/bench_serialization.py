@@ -0,0 +1,100 @@
+"""Serialization throughput: FastAPI's default encoding vs the fast JSON path.
+
+Run from the repo root:  python -m benchmarks.bench_serialization
+
+"default" is what the routes did before: jsonable_encoder + json.dumps.
+"fast" is app.fast_json.typed_json: a pre-built TypeAdapter's dump_json.
+"""
+import json
+import time
+from datetime import date, datetime, timedelta
+
+from beanie import PydanticObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.fast_json import typed_json
+from app.models import Transaction, UploadResponse, UPLOAD_RESPONSE_ADAPTER
+from invoices_api.models import Invoice, InvoiceItem, INVOICE_LIST_ADAPTER
+from tally_integration.schemas import TallyResponse, TALLY_RESPONSE_ADAPTER
+
+
+def upload_payload(rows: int = 50_000) -> UploadResponse:
+    start = date(2024, 1, 1)
+    txns = [
+        Transaction(
+            date=start + timedelta(days=i % 365),
+            description=f"UPI/{i}/ACME CORPORATION PAYMENT REF {i * 7}",
+            debit=None if i % 2 else 125.5 + i,
+            credit=250.75 + i if i % 2 else None,
+            balance=100_000 + i * 1.25,
+        )
+        for i in range(rows)
+    ]
+    return UploadResponse(filename="statement.pdf", upload_id=1.0, transactions=txns, message="ok")
+
+
+def invoice_payload(count: int = 5_000, items: int = 10) -> list:
+    now = datetime(2024, 1, 1)
+    # model_construct: Beanie documents can't be instantiated before init_beanie
+    return [
+        Invoice.model_construct(
+            id=PydanticObjectId(),
+            invoice_number=f"INV-{i:06d}",
+            customer_name=f"Customer {i % 300}",
+            customer_email=None,
+            customer_phone=None,
+            billing_address="12 Market Road, Pune",
+            shipping_address=None,
+            items=[
+                InvoiceItem(name=f"Item {j}", description="Consulting", quantity=j + 1, unit_price=99.5, total_price=99.5 * (j + 1))
+                for j in range(items)
+            ],
+            sub_total=5000.0,
+            tax_percentage=18.0,
+            tax_amount=900.0,
+            discount=0.0,
+            grand_total=5900.0,
+            currency="INR",
+            status="DRAFT",
+            issued_date=now,
+            due_date=now + timedelta(days=30),
+            notes=None,
+            search_terms=["customer", "item"],
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def tally_payload(rows: int = 20_000) -> TallyResponse:
+    data = [{"VoucherNo": f"S-{i}", "Status": "Imported", "Amount": i * 10.5, "Messages": []} for i in range(rows)]
+    return TallyResponse(success=True, message="ok", data=data, status_code=200)
+
+
+def bench(label: str, fn, repeat: int = 5) -> float:
+    fn()  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        size = len(fn())
+        best = min(best, time.perf_counter() - t0)
+    print(f"  {label:<8} {best * 1000:9.1f} ms   {size / best / 1e6:8.1f} MB/s")
+    return best
+
+
+def main():
+    cases = [
+        ("UploadResponse, 50k transactions", upload_payload(), UPLOAD_RESPONSE_ADAPTER),
+        ("Invoice list, 5k x 10 items", invoice_payload(), INVOICE_LIST_ADAPTER),
+        ("TallyResponse, 20k rows", tally_payload(), TALLY_RESPONSE_ADAPTER),
+    ]
+    for name, value, adapter in cases:
+        print(name)
+        before = bench("default", lambda: json.dumps(jsonable_encoder(value)).encode("utf-8"))
+        after = bench("fast", lambda: typed_json(adapter, value).body)
+        print(f"  speedup  {before / after:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
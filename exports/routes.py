@@ -0,0 +1,44 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from exports.schemas import ExportFormat
+from exports.services import (
+    MEDIA_TYPES,
+    export_transactions_service,
+    export_invoices_service,
+)
+
+exports_router = APIRouter(prefix="/exports", tags=["Exports"])
+
+
+def _stream(body, fmt: ExportFormat, name: str) -> StreamingResponse:
+    # No Content-Length, so the response goes out with chunked transfer encoding
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt.value}"'},
+    )
+
+
+@exports_router.get("/transactions")
+async def export_transactions(
+    format: ExportFormat = ExportFormat.csv,
+    start: Optional[date] = Query(None, description="First transaction date to include"),
+    end: Optional[date] = Query(None, description="Last transaction date to include"),
+    upload_id: Optional[float] = None,
+):
+    body = export_transactions_service(format, start, end, upload_id)
+    return _stream(body, format, "transactions")
+
+
+@exports_router.get("/invoices")
+async def export_invoices(
+    format: ExportFormat = ExportFormat.csv,
+    start: Optional[date] = Query(None, description="First issued date to include"),
+    end: Optional[date] = Query(None, description="Last issued date to include"),
+    status: Optional[str] = None,
+):
+    body = export_invoices_service(format, start, end, status)
+    return _stream(body, format, "invoices")
@@ -0,0 +1,228 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.services import transactions_collection
+from invoices_api.models import Invoice
+from exports.schemas import ExportFormat
+
+
+EXPORT_BATCH_SIZE = 5000
+
+# (field, type) — type is one of: string, float, datetime
+Columns = List[Tuple[str, str]]
+
+TRANSACTION_COLUMNS: Columns = [
+    ("_id", "string"),
+    ("account", "string"),
+    ("upload_id", "float"),
+    ("filename", "string"),
+    ("date", "datetime"),
+    ("description", "string"),
+    ("debit", "float"),
+    ("credit", "float"),
+    ("balance", "float"),
+    ("created_at", "datetime"),
+]
+
+INVOICE_COLUMNS: Columns = [
+    ("_id", "string"),
+    ("invoice_number", "string"),
+    ("customer_name", "string"),
+    ("customer_email", "string"),
+    ("status", "string"),
+    ("currency", "string"),
+    ("sub_total", "float"),
+    ("tax_amount", "float"),
+    ("discount", "float"),
+    ("grand_total", "float"),
+    ("issued_date", "datetime"),
+    ("due_date", "datetime"),
+    ("items", "string"),
+    ("notes", "string"),
+    ("created_at", "datetime"),
+    ("updated_at", "datetime"),
+]
+
+MEDIA_TYPES: Dict[ExportFormat, str] = {
+    ExportFormat.csv: "text/csv",
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.parquet: "application/vnd.apache.parquet",
+}
+
+
+# ------------------------------------------------------------------------------
+#                               CURSOR BATCHES
+# ------------------------------------------------------------------------------
+def _period_query(field: str, start: Optional[date], end: Optional[date]) -> dict:
+    bounds = {}
+    if start:
+        bounds["$gte"] = datetime.combine(start, time.min)
+    if end:
+        bounds["$lte"] = datetime.combine(end, time.max)
+    return {field: bounds} if bounds else {}
+
+
+async def _iter_batches(cursor, batch_size: int) -> AsyncIterator[List[dict]]:
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _json_default(val):
+    if isinstance(val, (datetime, date)):
+        return val.isoformat()
+    return str(val)
+
+
+def _flatten(doc: dict, columns: Columns) -> list:
+    row = []
+    for name, kind in columns:
+        val = doc.get(name)
+        if name == "_id" and val is not None:
+            val = str(val)
+        elif kind == "string" and isinstance(val, (list, dict)):
+            val = json.dumps(val, default=_json_default)
+        row.append(val)
+    return row
+
+
+# ------------------------------------------------------------------------------
+#                               ENCODERS
+# ------------------------------------------------------------------------------
+def _csv_cell(val):
+    if val is None:
+        return ""
+    if isinstance(val, datetime):
+        return val.isoformat()
+    return val
+
+
+async def _encode_csv(batches, columns: Columns) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow([name for name, _ in columns])
+
+    async for batch in batches:
+        writer.writerows(
+            [_csv_cell(v) for v in _flatten(doc, columns)] for doc in batch
+        )
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+
+    tail = buf.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+async def _encode_ndjson(batches, columns: Columns) -> AsyncIterator[bytes]:
+    names = [name for name, _ in columns]
+    async for batch in batches:
+        # Same fields as the CSV and Parquet exports, internal ones left out
+        lines = [
+            json.dumps(dict(zip(names, _flatten(doc, columns))), default=_json_default)
+            for doc in batch
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain.
+
+    Keeps its own position so the Parquet footer offsets stay correct while
+    earlier row groups have already been sent to the client.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def _encode_parquet(batches, columns: Columns) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"string": pa.string(), "float": pa.float64(), "datetime": pa.timestamp("ms")}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    try:
+        async for batch in batches:
+            # One row group per cursor batch, flushed as soon as it is full
+            rows = [_flatten(doc, columns) for doc in batch]
+            arrays = [
+                pa.array([r[i] for r in rows], type=schema.field(i).type)
+                for i in range(len(columns))
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+
+    yield sink.drain()
+
+
+ENCODERS = {
+    ExportFormat.csv: _encode_csv,
+    ExportFormat.ndjson: _encode_ndjson,
+    ExportFormat.parquet: _encode_parquet,
+}
+
+
+# ------------------------------------------------------------------------------
+#                               EXPORT SERVICES
+# ------------------------------------------------------------------------------
+def export_transactions_service(
+    fmt: ExportFormat,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    upload_id: Optional[float] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    query = _period_query("date", start, end)
+    if upload_id is not None:
+        query["upload_id"] = upload_id
+
+    cursor = transactions_collection.find(query).sort("date", 1).batch_size(batch_size)
+    return ENCODERS[fmt](_iter_batches(cursor, batch_size), TRANSACTION_COLUMNS)
+
+
+def export_invoices_service(
+    fmt: ExportFormat,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    status: Optional[str] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    query = _period_query("issued_date", start, end)
+    if status:
+        query["status"] = status
+
+    cursor = Invoice.get_motor_collection().find(query).sort("issued_date", 1).batch_size(batch_size)
+    return ENCODERS[fmt](_iter_batches(cursor, batch_size), INVOICE_COLUMNS)
@@ -1,8 +1,9 @@
 # app/models.py
 from beanie import Document
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, TypeAdapter
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
 
 
 class InvoiceItem(BaseModel):
@@ -38,8 +39,49 @@ class Invoice(Document):
 
     notes: Optional[str] = None
 
+    # Lowercase words from customer, notes and item names, for prefix search
+    search_terms: List[str] = []
+
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "invoices"   # MongoDB collection name
+        indexes = [
+            IndexModel(
+                [("customer_name", TEXT), ("notes", TEXT), ("items.name", TEXT)],
+                weights={"customer_name": 10, "items.name": 3, "notes": 1},
+                name="invoice_text",
+            ),
+            IndexModel([("search_terms", ASCENDING), ("issued_date", DESCENDING)], name="search_terms_issued"),
+            IndexModel([("customer_name", ASCENDING), ("issued_date", DESCENDING)], name="customer_issued"),
+            # Exports stream in issued_date order, optionally filtered by status
+            IndexModel([("issued_date", ASCENDING)], name="issued_date"),
+            IndexModel([("status", ASCENDING), ("issued_date", ASCENDING)], name="status_issued"),
+        ]
+
+
+class CustomerSummary(Document):
+    """Receivables per customer, kept current by the invoice services.
+
+    `due_buckets` maps a due day ("YYYY-MM-DD", or "undated") to the amount
+    still open on it, so overdue totals can be worked out at read time.
+    """
+    customer_name: str
+    open_count: int = 0
+    outstanding_total: float = 0
+    due_buckets: Dict[str, float] = {}
+    last_invoice_date: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "customer_summaries"
+        indexes = [
+            IndexModel([("customer_name", ASCENDING)], unique=True, name="customer_name_unique"),
+            IndexModel([("outstanding_total", DESCENDING)], name="outstanding_total"),
+        ]
+
+
+# Pre-built serializers for the invoice routes (see app.fast_json)
+INVOICE_ADAPTER = TypeAdapter(Invoice)
+INVOICE_LIST_ADAPTER = TypeAdapter(List[Invoice])
@@ -1,6 +1,9 @@
 # app/routes.py
-from fastapi import APIRouter, HTTPException
-from invoices_api.schemas import InvoiceCreate, InvoiceUpdate
+from typing import List
+from fastapi import APIRouter, HTTPException, Query
+from invoices_api.schemas import InvoiceCreate, InvoiceUpdate, CustomerSummaryResponse
+from invoices_api.models import INVOICE_ADAPTER, INVOICE_LIST_ADAPTER
+from app.fast_json import FastJSONResponse, typed_json
 from invoices_api.services import (
     create_invoice_service,
     get_all_invoices_service,
@@ -8,18 +11,48 @@ from invoices_api.services import (
     update_invoice_service,
     delete_invoice_service,
 )
+from invoices_api.summaries import (
+    get_customer_summary_service,
+    list_customer_summaries_service,
+    rebuild_customer_summaries_service,
+)
 
-invoices_api_router = APIRouter(prefix="/invoices", tags=["Invoices"])
+invoices_api_router = APIRouter(
+    prefix="/invoices",
+    tags=["Invoices"],
+    default_response_class=FastJSONResponse,
+)
 
 
 @invoices_api_router.post("/")
 async def create_invoice(data: InvoiceCreate):
-    return await create_invoice_service(data)
+    invoice = await create_invoice_service(data)
+    return typed_json(INVOICE_ADAPTER, invoice)
 
 
 @invoices_api_router.get("/")
 async def get_all_invoices():
-    return await get_all_invoices_service()
+    invoices = await get_all_invoices_service()
+    return typed_json(INVOICE_LIST_ADAPTER, invoices)
+
+
+@invoices_api_router.get("/customers/summaries", response_model=List[CustomerSummaryResponse])
+async def list_customer_summaries(skip: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=500)):
+    return await list_customer_summaries_service(skip, limit)
+
+
+@invoices_api_router.get("/customers/{customer_name}/summary", response_model=CustomerSummaryResponse)
+async def get_customer_summary(customer_name: str):
+    summary = await get_customer_summary_service(customer_name)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return summary
+
+
+@invoices_api_router.post("/customers/summaries/rebuild")
+async def rebuild_customer_summaries():
+    count = await rebuild_customer_summaries_service()
+    return {"message": f"Rebuilt {count} customer summaries"}
 
 
 @invoices_api_router.get("/{invoice_id}")
@@ -27,7 +60,7 @@ async def get_invoice(invoice_id: str):
     invoice = await get_invoice_service(invoice_id)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
-    return invoice
+    return typed_json(INVOICE_ADAPTER, invoice)
 
 
 @invoices_api_router.put("/{invoice_id}")
@@ -35,7 +68,7 @@ async def update_invoice(invoice_id: str, data: InvoiceUpdate):
     invoice = await update_invoice_service(invoice_id, data)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
-    return invoice
+    return typed_json(INVOICE_ADAPTER, invoice)
 
 
 @invoices_api_router.delete("/{invoice_id}")
@@ -43,3 +43,11 @@ class InvoiceUpdate(BaseModel):
     due_date: Optional[datetime] = None
     status: Optional[str] = None
     notes: Optional[str] = None
+
+
+class CustomerSummaryResponse(BaseModel):
+    customer_name: str
+    open_count: int
+    outstanding_total: float
+    overdue_total: float
+    last_invoice_date: Optional[datetime] = None
@@ -3,6 +3,13 @@ from datetime import datetime
 from typing import List
 from invoices_api.models import Invoice, InvoiceItem
 from invoices_api.schemas import InvoiceCreate, InvoiceUpdate
+from search.tokens import search_terms
+from invoices_api.summaries import (
+    invoice_snapshot,
+    on_invoice_created,
+    on_invoice_updated,
+    on_invoice_deleted,
+)
 
 
 def calculate_totals(items, tax_percentage, discount):
@@ -14,6 +21,10 @@ def calculate_totals(items, tax_percentage, discount):
     return sub_total, tax_amount, grand_total
 
 
+def invoice_search_terms(customer_name, notes, items):
+    return search_terms(customer_name, notes, *(item.name for item in items))
+
+
 async def create_invoice_service(data: InvoiceCreate):
     sub_total, tax_amount, grand_total = calculate_totals(
         [item.dict() for item in data.items],
@@ -35,11 +46,14 @@ async def create_invoice_service(data: InvoiceCreate):
         sub_total=sub_total,
         tax_amount=tax_amount,
         grand_total=grand_total,
+        search_terms=invoice_search_terms(data.customer_name, data.notes, data.items),
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
 
-    return await invoice.insert()
+    invoice = await invoice.insert()
+    await on_invoice_created(invoice)
+    return invoice
 
 
 async def get_all_invoices_service() -> List[Invoice]:
@@ -52,6 +66,9 @@ async def get_invoice_service(invoice_id: str) -> Invoice:
 
 async def update_invoice_service(invoice_id: str, data: InvoiceUpdate):
     invoice = await Invoice.get(invoice_id)
+    if not invoice:
+        return None
+    before = invoice_snapshot(invoice)
     update_data = data.dict(exclude_unset=True)
 
     if "items" in update_data:
@@ -73,8 +90,16 @@ async def update_invoice_service(invoice_id: str, data: InvoiceUpdate):
         update_data["tax_amount"] = tax_amount
         update_data["grand_total"] = grand_total
 
+    if {"customer_name", "notes", "items"} & update_data.keys():
+        update_data["search_terms"] = invoice_search_terms(
+            update_data.get("customer_name", invoice.customer_name),
+            update_data.get("notes", invoice.notes),
+            update_data.get("items", invoice.items),
+        )
+
     update_data["updated_at"] = datetime.utcnow()
     await invoice.set(update_data)
+    await on_invoice_updated(before, invoice)
 
     return invoice
 
@@ -83,4 +108,5 @@ async def delete_invoice_service(invoice_id: str):
     invoice = await Invoice.get(invoice_id)
     if invoice:
         await invoice.delete()
+        await on_invoice_deleted(invoice)
     return invoice
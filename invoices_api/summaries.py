@@ -0,0 +1,178 @@
+# invoices_api/summaries.py
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from invoices_api.models import Invoice, CustomerSummary
+from invoices_api.schemas import CustomerSummaryResponse
+
+
+CLOSED_STATUSES = ["PAID", "CANCELLED"]
+UNDATED = "undated"
+
+
+# ------------------------------------------------------------------------------
+#                               DELTAS
+# ------------------------------------------------------------------------------
+def invoice_snapshot(invoice: Invoice) -> dict:
+    """The invoice fields the summary depends on, taken before a change."""
+    return {
+        "customer_name": invoice.customer_name,
+        "status": invoice.status,
+        "grand_total": invoice.grand_total,
+        "due_date": invoice.due_date,
+        "issued_date": invoice.issued_date,
+    }
+
+
+def _due_key(due_date: Optional[datetime]) -> str:
+    return due_date.strftime("%Y-%m-%d") if due_date else UNDATED
+
+
+def summary_delta(inv: dict, sign: int) -> Dict[str, float]:
+    """$inc fields for adding (sign=1) or removing (sign=-1) one invoice."""
+    if inv["status"] in CLOSED_STATUSES:
+        return {}
+    amount = sign * inv["grand_total"]
+    return {
+        "open_count": sign,
+        "outstanding_total": amount,
+        f"due_buckets.{_due_key(inv.get('due_date'))}": amount,
+    }
+
+
+async def apply_summary_deltas(changes: Iterable[Tuple[str, Dict[str, float], Optional[datetime]]]):
+    """Apply (customer, $inc delta, issued_date) changes in one unordered bulk write."""
+    merged: Dict[str, Tuple[Dict[str, float], Optional[datetime]]] = {}
+    for customer, delta, issued in changes:
+        inc, last = merged.get(customer, ({}, None))
+        for field, val in delta.items():
+            inc[field] = inc.get(field, 0) + val
+        if issued is not None and (last is None or issued > last):
+            last = issued
+        merged[customer] = (inc, last)
+
+    now = datetime.utcnow()
+    ops = []
+    for customer, (inc, last) in merged.items():
+        update = {"$set": {"updated_at": now}}
+        if inc:
+            update["$inc"] = inc
+        if last is not None:
+            update["$max"] = {"last_invoice_date": last}
+        ops.append(UpdateOne({"customer_name": customer}, update, upsert=True))
+
+    if ops:
+        await CustomerSummary.get_motor_collection().bulk_write(ops, ordered=False)
+
+
+# ------------------------------------------------------------------------------
+#                               INVOICE HOOKS
+# ------------------------------------------------------------------------------
+async def on_invoice_created(invoice: Invoice):
+    inv = invoice_snapshot(invoice)
+    await apply_summary_deltas([(inv["customer_name"], summary_delta(inv, 1), inv["issued_date"])])
+
+
+async def on_invoice_updated(before: dict, invoice: Invoice):
+    after = invoice_snapshot(invoice)
+    await apply_summary_deltas([
+        (before["customer_name"], summary_delta(before, -1), None),
+        (after["customer_name"], summary_delta(after, 1), after["issued_date"]),
+    ])
+    if before["customer_name"] != after["customer_name"]:
+        await _refresh_last_invoice_date(before["customer_name"])
+
+
+async def on_invoice_deleted(invoice: Invoice):
+    inv = invoice_snapshot(invoice)
+    await apply_summary_deltas([(inv["customer_name"], summary_delta(inv, -1), None)])
+    await _refresh_last_invoice_date(inv["customer_name"])
+
+
+async def on_invoices_paid(invoices: List[dict]):
+    """Bulk status change to PAID (reconciliation); `invoices` hold the pre-change fields."""
+    await apply_summary_deltas(
+        (inv["customer_name"], summary_delta(inv, -1), None)
+        for inv in invoices
+    )
+
+
+async def _refresh_last_invoice_date(customer_name: str):
+    # $max can't move backwards, so look the latest one up on the customer_issued index
+    latest = await Invoice.get_motor_collection().find_one(
+        {"customer_name": customer_name},
+        {"issued_date": 1},
+        sort=[("issued_date", -1)],
+    )
+    await CustomerSummary.get_motor_collection().update_one(
+        {"customer_name": customer_name},
+        {"$set": {"last_invoice_date": latest["issued_date"] if latest else None, "updated_at": datetime.utcnow()}},
+    )
+
+
+# ------------------------------------------------------------------------------
+#                               READS + REBUILD
+# ------------------------------------------------------------------------------
+def summary_response(summary: CustomerSummary, today: Optional[str] = None) -> CustomerSummaryResponse:
+    today = today or datetime.utcnow().strftime("%Y-%m-%d")
+    overdue = sum(
+        amount for day, amount in summary.due_buckets.items()
+        if day != UNDATED and day < today
+    )
+    return CustomerSummaryResponse(
+        customer_name=summary.customer_name,
+        open_count=summary.open_count,
+        outstanding_total=round(summary.outstanding_total, 2),
+        overdue_total=round(overdue, 2),
+        last_invoice_date=summary.last_invoice_date,
+    )
+
+
+async def get_customer_summary_service(customer_name: str) -> Optional[CustomerSummaryResponse]:
+    summary = await CustomerSummary.find_one(CustomerSummary.customer_name == customer_name)
+    return summary_response(summary) if summary else None
+
+
+async def list_customer_summaries_service(skip: int = 0, limit: int = 50) -> List[CustomerSummaryResponse]:
+    summaries = await CustomerSummary.find_all().sort(-CustomerSummary.outstanding_total).skip(skip).limit(limit).to_list()
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    return [summary_response(s, today) for s in summaries]
+
+
+async def rebuild_customer_summaries_service() -> int:
+    """Recompute every summary from the invoices collection (repair after drift)."""
+    is_open = {"$not": [{"$in": ["$status", CLOSED_STATUSES]}]}
+    pipeline = [
+        {"$group": {
+            "_id": {
+                "customer": "$customer_name",
+                "due": {"$ifNull": [{"$dateToString": {"format": "%Y-%m-%d", "date": "$due_date"}}, UNDATED]},
+            },
+            "open_count": {"$sum": {"$cond": [is_open, 1, 0]}},
+            "outstanding": {"$sum": {"$cond": [is_open, "$grand_total", 0]}},
+            "last": {"$max": "$issued_date"},
+        }},
+        {"$group": {
+            "_id": "$_id.customer",
+            "open_count": {"$sum": "$open_count"},
+            "outstanding_total": {"$sum": "$outstanding"},
+            "last_invoice_date": {"$max": "$last"},
+            "due_buckets": {"$push": {"k": "$_id.due", "v": "$outstanding"}},
+        }},
+        {"$project": {
+            "_id": 0,
+            "customer_name": "$_id",
+            "open_count": 1,
+            "outstanding_total": 1,
+            "last_invoice_date": 1,
+            "due_buckets": {"$arrayToObject": {
+                "$filter": {"input": "$due_buckets", "cond": {"$ne": ["$$this.v", 0]}}
+            }},
+            "updated_at": "$$NOW",
+        }},
+        # $out swaps the collection in atomically and keeps its indexes
+        {"$out": CustomerSummary.Settings.name},
+    ]
+    await Invoice.get_motor_collection().aggregate(pipeline).to_list(length=None)
+    return await CustomerSummary.get_motor_collection().count_documents({})
@@ -4,19 +4,29 @@ from fastapi import FastAPI
 from app.routes import router
 from tally_integration.routes import router as tally_router
 from invoices_api.routes import invoices_api_router
+from reconciliation.routes import reconciliation_router
+from exports.routes import exports_router
+from search.routes import search_router
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
-from invoices_api.models import Invoice
+from invoices_api.models import Invoice, CustomerSummary
+from app.parse_pool import shutdown_parse_pool
+from app.admission import UploadSizeLimitMiddleware
+from app.services import ensure_transaction_indexes
 
 
 app = FastAPI(title="Auto Accountant API")
+app.add_middleware(UploadSizeLimitMiddleware)
 
 app.include_router(router)
 app.include_router(tally_router)
 app.include_router(invoices_api_router)
+app.include_router(reconciliation_router)
+app.include_router(exports_router)
+app.include_router(search_router)
 
 
 app.mount("/static", StaticFiles(directory="frontend"), name="static")
@@ -35,8 +45,9 @@ async def init_db():
             client = AsyncIOMotorClient(mongo_url)
             await init_beanie(
                 database=client.get_default_database(),
-                document_models=[Invoice]
+                document_models=[Invoice, CustomerSummary]
             )
+            await ensure_transaction_indexes()
             print("✅ MongoDB connected successfully")
             return
         except Exception as e:
@@ -46,6 +57,11 @@ async def init_db():
     raise RuntimeError("❌ Could not connect to MongoDB after multiple retries")
 
 
+@app.on_event("shutdown")
+async def close_parse_pool():
+    shutdown_parse_pool()
+
+
 @app.get("/")
 async def root():
     return FileResponse("frontend/index.html")
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException, Query
+from reconciliation.schemas import ReconcileResponse
+from reconciliation.services import reconcile_upload_service
+
+reconciliation_router = APIRouter(prefix="/reconcile", tags=["Reconciliation"])
+
+
+@reconciliation_router.post("/{upload_id}", response_model=ReconcileResponse)
+async def reconcile_upload(
+    upload_id: float,
+    days_before: int = Query(30, ge=0, description="Days a payment may arrive before the due date"),
+    days_after: int = Query(60, ge=0, description="Days a payment may arrive after the due date"),
+    apply: bool = Query(True, description="Mark matched invoices PAID; false for a dry run"),
+):
+    """Match the credit transactions of one uploaded statement against open invoices."""
+    try:
+        return await reconcile_upload_service(upload_id, days_before, days_after, apply)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reconciliation failed: {str(e)}")
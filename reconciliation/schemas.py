@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class ReconcileMatch(BaseModel):
+    transaction_id: str
+    invoice_id: str
+    invoice_number: str
+    amount: float
+    rule: str  # invoice_number, customer_amount, amount_date
+
+
+class ReconcileResponse(BaseModel):
+    upload_id: float
+    credits_checked: int
+    matched: int
+    unmatched: int
+    applied: bool
+    matches: List[ReconcileMatch]
+    message: Optional[str] = None
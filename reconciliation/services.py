@@ -0,0 +1,195 @@
+import re
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.services import transactions_collection
+from invoices_api.models import Invoice
+from invoices_api.summaries import CLOSED_STATUSES, on_invoices_paid
+from reconciliation.schemas import ReconcileMatch, ReconcileResponse
+from search.tokens import tokenize
+
+
+_TOKEN = re.compile(r"[A-Za-z0-9][A-Za-z0-9\-/]*")
+_NON_ALNUM = re.compile(r"[^A-Z0-9]")
+
+
+def _norm(val: str) -> str:
+    return _NON_ALNUM.sub("", val.upper())
+
+
+def _words(val: Optional[str]) -> str:
+    # Space-padded token sequence, so `in` only matches whole words
+    return f" {' '.join(tokenize(val))} "
+
+
+def _amount_key(val: float) -> int:
+    # Compare in paise so float noise can't break the hash lookup
+    return int(round(val * 100))
+
+
+# ------------------------------------------------------------------------------
+#                               INVOICE INDEX
+# ------------------------------------------------------------------------------
+class InvoiceIndex:
+    """Hash and sorted-interval indexes over open invoices.
+
+    - by_number: normalised invoice number -> invoice
+    - by_amount: grand_total in paise -> (sorted due timestamps, invoices)
+
+    A transaction only ever looks at the invoices sharing its exact amount,
+    narrowed by bisecting the due-date list, so matching never compares every
+    transaction with every invoice.
+    """
+
+    def __init__(self, invoices: List[dict]):
+        self.by_number: Dict[str, dict] = {}
+        buckets: Dict[int, List[Tuple[float, dict]]] = {}
+
+        for inv in invoices:
+            self.by_number[_norm(inv["invoice_number"])] = inv
+            due = inv.get("due_date") or inv.get("issued_date")
+            inv["_due_ts"] = due.timestamp() if due else 0.0
+            inv["_customer"] = _words(inv.get("customer_name")).strip()
+            buckets.setdefault(_amount_key(inv["grand_total"]), []).append((inv["_due_ts"], inv))
+
+        self.by_amount: Dict[int, Tuple[List[float], List[dict]]] = {}
+        for key, pairs in buckets.items():
+            pairs.sort(key=lambda p: p[0])
+            self.by_amount[key] = ([p[0] for p in pairs], [p[1] for p in pairs])
+
+    def by_description(self, description: str) -> Optional[dict]:
+        for token in _TOKEN.findall(description or ""):
+            inv = self.by_number.get(_norm(token))
+            if inv is not None:
+                return inv
+        return None
+
+    def in_window(self, amount: float, lo: float, hi: float) -> List[dict]:
+        bucket = self.by_amount.get(_amount_key(amount))
+        if bucket is None:
+            return []
+        due, invs = bucket
+        return invs[bisect_left(due, lo):bisect_right(due, hi)]
+
+
+def match_transactions(
+    transactions: List[dict],
+    invoices: List[dict],
+    days_before: int = 30,
+    days_after: int = 60,
+) -> List[ReconcileMatch]:
+    """Match credit transactions to open invoices, each invoice at most once.
+
+    Rules, strongest first:
+    1. an invoice number appears in the description and the amount agrees
+    2. amount agrees, due date in window and the customer name appears as whole words
+       in the description
+    3. amount agrees and exactly one invoice (claimed or not) is due in the window
+    """
+    index = InvoiceIndex(invoices)
+    used = set()
+    matches = []
+    before, after = timedelta(days=days_before).total_seconds(), timedelta(days=days_after).total_seconds()
+
+    for txn in transactions:
+        amount = txn["credit"]
+        inv, rule = None, None
+
+        hit = index.by_description(txn.get("description"))
+        if hit is not None and hit["_id"] not in used and _amount_key(hit["grand_total"]) == _amount_key(amount):
+            inv, rule = hit, "invoice_number"
+
+        elif txn.get("date") is not None:
+            # Paid up to `days_before` ahead of the due date or `days_after` late
+            ts = txn["date"].timestamp()
+            window = index.in_window(amount, ts - after, ts + before)
+            candidates = [c for c in window if c["_id"] not in used]
+
+            desc = _words(txn.get("description"))
+            named = [c for c in candidates if c["_customer"] and f" {c['_customer']} " in desc]
+            if named:
+                inv, rule = min(named, key=lambda c: abs(c["_due_ts"] - ts)), "customer_amount"
+            elif len(window) == 1 and candidates:
+                # Ambiguity is judged on the whole window, not on what earlier
+                # transactions left over, so the outcome doesn't depend on order
+                inv, rule = candidates[0], "amount_date"
+
+        if inv is not None:
+            used.add(inv["_id"])
+            matches.append(ReconcileMatch(
+                transaction_id=str(txn["_id"]),
+                invoice_id=str(inv["_id"]),
+                invoice_number=inv["invoice_number"],
+                amount=amount,
+                rule=rule,
+            ))
+
+    return matches
+
+
+# ------------------------------------------------------------------------------
+#                               RECONCILE SERVICE
+# ------------------------------------------------------------------------------
+async def reconcile_upload_service(
+    upload_id: float,
+    days_before: int = 30,
+    days_after: int = 60,
+    apply: bool = True,
+) -> ReconcileResponse:
+    transactions = await transactions_collection.find(
+        # Credits reconciled by an earlier run keep their invoice
+        {"upload_id": upload_id, "credit": {"$gt": 0}, "invoice_id": {"$exists": False}},
+        {"date": 1, "description": 1, "credit": 1},
+    ).sort("date", 1).to_list(length=None)
+
+    invoices = await Invoice.get_motor_collection().find(
+        {"status": {"$nin": CLOSED_STATUSES}},
+        {"invoice_number": 1, "customer_name": 1, "grand_total": 1, "due_date": 1, "issued_date": 1, "status": 1},
+    ).to_list(length=None)
+
+    matches = match_transactions(transactions, invoices, days_before, days_after)
+
+    if apply and matches:
+        now = datetime.utcnow()
+        # Tag this run's writes: an invoice closed by someone else since the read
+        # above is left alone, and only invoices this run changed count as matched
+        run_id = ObjectId()
+        invoices_coll = Invoice.get_motor_collection()
+        ids = [ObjectId(m.invoice_id) for m in matches]
+        await invoices_coll.update_many(
+            {"_id": {"$in": ids}, "status": {"$nin": CLOSED_STATUSES}},
+            {"$set": {"status": "PAID", "updated_at": now, "reconcile_run": run_id}},
+        )
+        paid = {
+            str(doc["_id"])
+            for doc in await invoices_coll.find({"_id": {"$in": ids}, "reconcile_run": run_id}, {"_id": 1}).to_list(length=None)
+        }
+        matches = [m for m in matches if m.invoice_id in paid]
+
+        by_id = {str(inv["_id"]): inv for inv in invoices}
+        await on_invoices_paid([by_id[m.invoice_id] for m in matches])
+        if matches:
+            await transactions_collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": ObjectId(m.transaction_id), "invoice_id": {"$exists": False}},
+                        {"$set": {"invoice_id": m.invoice_id, "reconciled_at": now}},
+                    )
+                    for m in matches
+                ],
+                ordered=False,
+            )
+
+    return ReconcileResponse(
+        upload_id=upload_id,
+        credits_checked=len(transactions),
+        matched=len(matches),
+        unmatched=len(transactions) - len(matches),
+        applied=apply,
+        matches=matches,
+        message=f"Matched {len(matches)} of {len(transactions)} credit transactions",
+    )
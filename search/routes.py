@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Query
+from search.schemas import SearchScope, SearchResponse
+from search.services import search_service, backfill_search_terms_service
+
+search_router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@search_router.get("/", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, description="Words to look for"),
+    scope: SearchScope = SearchScope.all,
+    prefix: bool = Query(False, description="Treat the last word as a prefix (search as you type)"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+):
+    """Search transaction descriptions and invoice customer, notes and item names."""
+    try:
+        return await search_service(q, scope, prefix, page, page_size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
+
+@search_router.post("/backfill")
+async def backfill_search_terms():
+    """Index documents stored before prefix search existed; safe to run more than once."""
+    counts = await backfill_search_terms_service()
+    return {"message": f"Backfilled {counts['transactions']} transactions and {counts['invoices']} invoices", **counts}
@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+
+
+class SearchScope(str, Enum):
+    all = "all"
+    transactions = "transactions"
+    invoices = "invoices"
+
+
+class TransactionHit(BaseModel):
+    id: str
+    upload_id: Optional[float] = None
+    date: Optional[datetime] = None
+    description: Optional[str] = None
+    debit: Optional[float] = None
+    credit: Optional[float] = None
+    balance: Optional[float] = None
+    score: Optional[float] = None
+
+
+class InvoiceHit(BaseModel):
+    id: str
+    invoice_number: str
+    customer_name: str
+    status: str
+    grand_total: float
+    issued_date: Optional[datetime] = None
+    score: Optional[float] = None
+
+
+class SearchResponse(BaseModel):
+    query: str
+    page: int
+    page_size: int
+    transactions: List[TransactionHit] = []
+    invoices: List[InvoiceHit] = []
+    has_more_transactions: bool = False
+    has_more_invoices: bool = False
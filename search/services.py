@@ -0,0 +1,112 @@
+import re
+from typing import Dict, List, Tuple
+
+from pymongo import UpdateOne
+
+from app.services import transactions_collection
+from invoices_api.models import Invoice
+from search.schemas import SearchScope, SearchResponse, TransactionHit, InvoiceHit
+from search.tokens import MIN_TERM_LENGTH, search_terms, tokenize
+
+
+TRANSACTION_FIELDS = {"upload_id": 1, "date": 1, "description": 1, "debit": 1, "credit": 1, "balance": 1}
+INVOICE_FIELDS = {"invoice_number": 1, "customer_name": 1, "status": 1, "grand_total": 1, "issued_date": 1}
+
+
+def _prefix_query(terms: List[str]) -> dict:
+    """Whole words must match exactly; the last one may be a prefix.
+
+    Words shorter than MIN_TERM_LENGTH are dropped from the whole-word part,
+    the same way `search_terms` drops them when indexing.
+
+    An anchored, case-sensitive regex on the multikey `search_terms` index is
+    answered with an index range scan, not a collection scan.
+    """
+    *whole, last = terms
+    # search_terms never stores short words, so requiring them would match nothing
+    whole = [t for t in whole if len(t) >= MIN_TERM_LENGTH]
+    query = {"search_terms": {"$regex": f"^{re.escape(last)}"}}
+    if whole:
+        query = {"$and": [{"search_terms": {"$all": whole}}, query]}
+    return query
+
+
+async def _run(collection, q: str, terms: List[str], prefix: bool, fields: dict, sort_field: str,
+               skip: int, limit: int) -> Tuple[List[dict], bool]:
+    if prefix:
+        cursor = collection.find(_prefix_query(terms), fields).sort(sort_field, -1)
+    else:
+        # Ranked by the text index score
+        projection = {**fields, "score": {"$meta": "textScore"}}
+        cursor = collection.find({"$text": {"$search": q}}, projection).sort(
+            [("score", {"$meta": "textScore"})]
+        )
+
+    # Fetch one extra row to know if there is a next page without counting
+    docs = await cursor.skip(skip).limit(limit + 1).to_list(length=limit + 1)
+    return docs[:limit], len(docs) > limit
+
+
+async def search_service(
+    q: str,
+    scope: SearchScope = SearchScope.all,
+    prefix: bool = False,
+    page: int = 1,
+    page_size: int = 20,
+) -> SearchResponse:
+    terms = tokenize(q)
+    response = SearchResponse(query=q, page=page, page_size=page_size)
+    if not terms:
+        return response
+
+    skip = (page - 1) * page_size
+
+    if scope in (SearchScope.all, SearchScope.transactions):
+        docs, more = await _run(transactions_collection, q, terms, prefix, TRANSACTION_FIELDS, "date", skip, page_size)
+        response.transactions = [TransactionHit(id=str(d.pop("_id")), **d) for d in docs]
+        response.has_more_transactions = more
+
+    if scope in (SearchScope.all, SearchScope.invoices):
+        docs, more = await _run(Invoice.get_motor_collection(), q, terms, prefix, INVOICE_FIELDS, "issued_date", skip, page_size)
+        response.invoices = [InvoiceHit(id=str(d.pop("_id")), **d) for d in docs]
+        response.has_more_invoices = more
+
+    return response
+
+
+# ------------------------------------------------------------------------------
+#                               BACKFILL
+# ------------------------------------------------------------------------------
+BACKFILL_BATCH_SIZE = 1000
+
+
+async def _backfill(collection, fields: dict, terms_for, batch_size: int) -> int:
+    updated = 0
+    ops = []
+    async for doc in collection.find({"search_terms": {"$exists": False}}, fields):
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"search_terms": terms_for(doc)}}))
+        if len(ops) >= batch_size:
+            await collection.bulk_write(ops, ordered=False)
+            updated += len(ops)
+            ops = []
+    if ops:
+        await collection.bulk_write(ops, ordered=False)
+        updated += len(ops)
+    return updated
+
+
+async def backfill_search_terms_service(batch_size: int = BACKFILL_BATCH_SIZE) -> Dict[str, int]:
+    """Add `search_terms` to documents stored before prefix search existed."""
+    transactions = await _backfill(
+        transactions_collection,
+        {"description": 1},
+        lambda d: search_terms(d.get("description")),
+        batch_size,
+    )
+    invoices = await _backfill(
+        Invoice.get_motor_collection(),
+        {"customer_name": 1, "notes": 1, "items.name": 1},
+        lambda d: search_terms(d.get("customer_name"), d.get("notes"), *(i.get("name") for i in d.get("items") or [])),
+        batch_size,
+    )
+    return {"transactions": transactions, "invoices": invoices}
@@ -0,0 +1,20 @@
+import re
+from typing import List, Optional
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+MIN_TERM_LENGTH = 2
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return _WORD.findall(text.lower())
+
+
+def search_terms(*texts: Optional[str]) -> List[str]:
+    """Distinct lowercase words for the `search_terms` index used by prefix search."""
+    terms = set()
+    for text in texts:
+        terms.update(t for t in tokenize(text) if len(t) >= MIN_TERM_LENGTH)
+    return sorted(terms)
@@ -2,10 +2,11 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks
 from typing import List
 import asyncio
 import threading
-from .schemas import SalesWithoutInventoryRequest, TallyResponse, SalesWithoutInventoryItem
+from .schemas import SalesWithoutInventoryRequest, TallyResponse, SalesWithoutInventoryItem, TALLY_RESPONSE_ADAPTER
 from .services import tally_service
+from app.fast_json import FastJSONResponse, typed_json
 
-router = APIRouter(prefix="/tally", tags=["Tally Integration"])
+router = APIRouter(prefix="/tally", tags=["Tally Integration"], default_response_class=FastJSONResponse)
 
 @router.post(
     "/sales-without-inventory",
@@ -30,7 +31,7 @@ def update_sales_without_inventory(
                 detail=result.message
             )
             
-        return result
+        return typed_json(TALLY_RESPONSE_ADAPTER, result)
         
     except HTTPException:
         raise
@@ -60,7 +61,7 @@ def update_single_sale(sale_item: SalesWithoutInventoryItem):
                 detail=result.message
             )
             
-        return result
+        return typed_json(TALLY_RESPONSE_ADAPTER, result)
         
     except HTTPException:
         raise
@@ -92,7 +93,7 @@ def delete_uploaded_data():
                 detail=result.message
             )
             
-        return result
+        return typed_json(TALLY_RESPONSE_ADAPTER, result)
         
     except HTTPException:
         raise
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import List, Optional
 
 class SalesWithoutInventoryItem(BaseModel):
@@ -77,4 +77,8 @@ class TallyResponse(BaseModel):
 
 class DeleteUploadedDataRequest(BaseModel):
     IsFileReceived: str = "true"
-    CompanyName: str
\ No newline at end of file
+    CompanyName: str
+
+# Pre-built serializers for the large request/response models (see app.fast_json)
+SALES_REQUEST_ADAPTER = TypeAdapter(SalesWithoutInventoryRequest)
+TALLY_RESPONSE_ADAPTER = TypeAdapter(TallyResponse)
@@ -1,8 +1,8 @@
 import requests
 import os
-import json
+import orjson
 from typing import Dict, Any
-from .schemas import SalesWithoutInventoryRequest, TallyResponse
+from .schemas import SalesWithoutInventoryRequest, TallyResponse, SALES_REQUEST_ADAPTER
 
 class TallyService:
     def __init__(self):
@@ -35,24 +35,24 @@ class TallyService:
         Update sales without inventory in Tally
         """
         try:
-            # Convert Pydantic model to dict
-            payload = sales_data.model_dump(by_alias=True)
+            # Serialize straight to JSON bytes with the pre-built adapter
+            payload = SALES_REQUEST_ADAPTER.dump_json(sales_data, by_alias=True)
             
             print(f"Making request to: {self.tally_api_url}")
             print(f"Headers: {self._get_headers()}")
-            print(f"Payload sample: {json.dumps(payload, indent=2)[:500]}...")
+            print(f"Payload sample: {payload[:500].decode('utf-8', errors='replace')}...")
             
             response = requests.post(
                 self.tally_api_url,
-                json=payload,
+                data=payload,
                 headers=self._get_headers(),
                 timeout=30
             )
             
             # Try to get response text
             try:
-                response_data = response.json()
-            except:
+                response_data = orjson.loads(response.content)
+            except orjson.JSONDecodeError:
                 response_data = response.text
                 
             if response.status_code == 200: